@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""ローダー・シーダー ベンチマークツール
+
+demo/seed.py と dbt_project/seeds_loader/load.py を使い捨てのデータベースに対して実行し、
+データ規模（シミュレーション日数）ごと・戦略ごとの処理時間を計測します。
+
+実行前提:
+  - docker-compose.yml の demo-db および dwh-db コンテナが起動していること
+  - プロジェクトルートに .env.local ファイルが存在すること
+
+処理内容:
+  1. demo-db サーバーにベンチマーク用データベース（demo-bench）を作り直す
+  2. 規模ごとに各シーダーエンジンでデータを生成し、所要時間を計測する
+  3. dwh-db サーバーのベンチマーク用データベース（dwh-bench）に対し、
+     各ロード戦略でテーブルごとの転送時間を計測する
+  4. 計測結果を CSV ファイルに追記する（既存の行は残すので実行間の比較ができる）
+
+  本番の demo-db / dbt_warehouse データベースには一切触れない。
+
+使い方:
+  uv run python bench/bench.py
+  uv run python bench/bench.py --scales 30 180 365 --repeat 3
+"""
+
+import argparse
+import csv
+import functools
+import importlib.util
+import io
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+import psycopg2
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _load_module(name: str, path: Path) -> ModuleType:
+    """スクリプトをモジュールとして読み込む（init.py 同士の名前衝突を避けるため）"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+demo_init = _load_module("demo_init", PROJECT_ROOT / "demo" / "init.py")
+demo_seed = _load_module("demo_seed", PROJECT_ROOT / "demo" / "seed.py")
+loader_init = _load_module(
+    "loader_init", PROJECT_ROOT / "dbt_project" / "seeds_loader" / "init.py"
+)
+loader = _load_module(
+    "loader_load", PROJECT_ROOT / "dbt_project" / "seeds_loader" / "load.py"
+)
+cdc = _load_module("loader_cdc", PROJECT_ROOT / "dbt_project" / "seeds_loader" / "cdc.py")
+
+BENCH_SRC_DB = "demo-bench"
+BENCH_DST_DB = "dwh-bench"
+
+# ベンチマーク用の接続先（サーバーは本番と同じ、データベースだけ差し替える）
+BENCH_SRC_CONN_PARAMS = {**demo_init.CONN_PARAMS, "dbname": BENCH_SRC_DB}
+BENCH_DST_CONN_PARAMS = {**loader.DST_CONN_PARAMS, "dbname": BENCH_DST_DB}
+
+DEFAULT_SCALES = [30, 90, 180]
+DEFAULT_OUTPUT = Path(__file__).parent / "results.csv"
+
+RESULT_FIELDS = [
+    "run_at",
+    "git_rev",
+    "stage",
+    "strategy",
+    "scale_days",
+    "repeat",
+    "table",
+    "rows",
+    "seconds",
+]
+
+# シーダーエンジン: (開始日, 接続設定, 乱数シード) を受け取りデータを生成する
+SEEDERS: dict[str, Callable[[date, dict, int], None]] = {
+    "python": demo_seed.seed,
+    "sql": demo_seed.seed_sql,
+}
+
+
+# ---------------------------------------------------------------------------
+# ロード戦略
+# ---------------------------------------------------------------------------
+
+def copy_table_copy(
+    src_cur: psycopg2.extensions.cursor,
+    dst_cur: psycopg2.extensions.cursor,
+    table_name: str,
+    col_info: list[tuple],
+) -> None:
+    """COPY TO STDOUT / COPY FROM STDIN でテーブルを転送する（メモリ上のバッファを経由する）"""
+    columns = [row[0] for row in col_info]
+    buffer = io.StringIO()
+    src_cur.copy_expert(
+        f"COPY (SELECT {loader.select_list(table_name, columns)} FROM {table_name}) TO STDOUT",
+        buffer,
+    )
+    buffer.seek(0)
+    dst_cur.execute(f"TRUNCATE TABLE {loader.DEST_SCHEMA}.{table_name}")
+    dst_cur.copy_expert(
+        f"COPY {loader.DEST_SCHEMA}.{table_name} ({', '.join(columns)}) FROM STDIN", buffer
+    )
+
+
+@functools.cache
+def _manifest_references() -> dict[str, set[str] | None] | None:
+    return loader.source_references()
+
+
+def copy_table_pruned(
+    src_cur: psycopg2.extensions.cursor,
+    dst_cur: psycopg2.extensions.cursor,
+    table_name: str,
+    col_info: list[tuple],
+) -> None:
+    """manifest.json で絞り込んだカラムだけを copy_table で転送する（load.py の既定の動作）。
+
+    manifest.json が無い場合は execute_values と同じ全カラムの転送になる。
+    """
+    references = _manifest_references()
+    if references is not None and table_name not in references:
+        # どのモデルからも参照されていないテーブルは転送しない
+        dst_cur.execute(f"TRUNCATE TABLE {loader.DEST_SCHEMA}.{table_name}")
+        return
+    identifiers = references[table_name] if references is not None else None
+    loader.copy_table(src_cur, dst_cur, table_name, loader.prune_columns(col_info, identifiers))
+
+
+def apply_table_cdc(
+    src_cur: psycopg2.extensions.cursor,
+    dst_cur: psycopg2.extensions.cursor,
+    table_name: str,
+    col_info: list[tuple],
+) -> None:
+    """テーブルの全行を INSERT の変更データとして cdc.apply_changes で反映する。
+
+    WAL の読み取り・解析は含まず、変更の反映（ID で削除 → public_raw の型にキャストして挿入）だけを計測する。
+    値は test_decoding と同じくテキスト表現で渡す。
+    """
+    columns = [row[0] for row in col_info]
+    src_cur.execute(f"SELECT {', '.join(f'{c}::text' for c in columns)} FROM {table_name}")
+    change_set = cdc.ChangeSet()
+    rows = change_set.rows.setdefault(table_name, {})
+    for values in src_cur.fetchall():
+        row = dict(zip(columns, values))
+        rows[row[cdc.KEY_COLUMN]] = row
+    cdc.apply_changes(dst_cur, change_set)
+
+
+# ロード戦略: load.copy_table と同じシグネチャで 1 テーブル分を転送する
+LOAD_STRATEGIES: dict[str, Callable] = {
+    "execute_values": loader.copy_table,
+    "copy": copy_table_copy,
+    "pruned": copy_table_pruned,
+    "cdc_apply": apply_table_cdc,
+}
+
+
+# ---------------------------------------------------------------------------
+# ベンチマーク用データベース
+# ---------------------------------------------------------------------------
+
+def recreate_database(conn_params: dict, db_name: str) -> None:
+    """サーバーのメンテナンス用 DB に接続し、ベンチマーク用 DB を作り直す"""
+    conn = psycopg2.connect(**conn_params)
+    conn.autocommit = True
+    try:
+        demo_init.drop_database_if_exists(conn, db_name)
+        demo_init.create_database(conn, db_name)
+    finally:
+        conn.close()
+
+
+def count_rows(cur: psycopg2.extensions.cursor, table_name: str) -> int:
+    cur.execute(f"SELECT COUNT(*) FROM {table_name}")
+    return cur.fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+# 計測
+# ---------------------------------------------------------------------------
+
+def bench_seed(engine: str, scale_days: int, random_seed: int) -> list[dict]:
+    """ソース DB を作り直してデータを生成し、所要時間と生成件数を返す"""
+    recreate_database(demo_init.CONN_PARAMS, BENCH_SRC_DB)
+    demo_init.create_tables(BENCH_SRC_DB)
+
+    start_date = date.today() - timedelta(days=scale_days)
+    started = time.perf_counter()
+    SEEDERS[engine](start_date, BENCH_SRC_CONN_PARAMS, random_seed)
+    elapsed = time.perf_counter() - started
+
+    conn = psycopg2.connect(**BENCH_SRC_CONN_PARAMS)
+    try:
+        cur = conn.cursor()
+        rows = sum(count_rows(cur, table_name) for table_name in loader.TABLES)
+    finally:
+        conn.close()
+
+    return [{"stage": "seed", "strategy": engine, "table": "*", "rows": rows, "seconds": elapsed}]
+
+
+def bench_load(strategy: str) -> list[dict]:
+    """public_raw を初期化してから全テーブルを転送し、テーブルごとの所要時間を返す"""
+    results = []
+    src_conn = psycopg2.connect(**BENCH_SRC_CONN_PARAMS)
+    dst_conn = psycopg2.connect(**BENCH_DST_CONN_PARAMS)
+    try:
+        loader_init.init_raw_schema(dst_conn)
+        src_cur = src_conn.cursor()
+        dst_cur = dst_conn.cursor()
+
+        total_rows = 0
+        total_elapsed = 0.0
+        for table_name in loader.TABLES:
+            col_info = loader.get_column_info(src_cur, table_name)
+            loader.create_table_if_not_exists(dst_cur, table_name, col_info)
+            dst_conn.commit()
+
+            started = time.perf_counter()
+            LOAD_STRATEGIES[strategy](src_cur, dst_cur, table_name, col_info)
+            dst_conn.commit()
+            elapsed = time.perf_counter() - started
+
+            rows = count_rows(dst_cur, f"{loader.DEST_SCHEMA}.{table_name}")
+            results.append(
+                {"stage": "load", "strategy": strategy, "table": table_name,
+                 "rows": rows, "seconds": elapsed}
+            )
+            total_rows += rows
+            total_elapsed += elapsed
+
+        results.append(
+            {"stage": "load", "strategy": strategy, "table": "*",
+             "rows": total_rows, "seconds": total_elapsed}
+        )
+    finally:
+        src_conn.close()
+        dst_conn.close()
+    return results
+
+
+def git_revision() -> str:
+    """計測対象のコミットを記録する（git が使えない場合は空文字）"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def append_results(
+    output: Path, rows: list[dict], fieldnames: list[str] = RESULT_FIELDS
+) -> None:
+    """計測結果を CSV に追記する。ファイルが無い場合はヘッダー付きで作成する。"""
+    is_new = not output.exists()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if is_new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_summary(rows: list[dict]) -> None:
+    print()
+    print(f"{'stage':<6} {'strategy':<16} {'days':>5} {'rep':>3} {'rows':>10} {'seconds':>9}")
+    for row in rows:
+        if row["table"] != "*":
+            continue
+        print(
+            f"{row['stage']:<6} {row['strategy']:<16} {row['scale_days']:>5} "
+            f"{row['repeat']:>3} {row['rows']:>10} {row['seconds']:>9.3f}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# メイン処理
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ローダー・シーダーのベンチマーク")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+        help="シミュレーション日数（規模）のリスト",
+    )
+    parser.add_argument(
+        "--seeders", nargs="+", choices=sorted(SEEDERS), default=sorted(SEEDERS),
+        help="計測するシーダーエンジン（ロードの計測には最後のエンジンのデータを使う）",
+    )
+    parser.add_argument(
+        "--strategies", nargs="+", choices=sorted(LOAD_STRATEGIES),
+        default=sorted(LOAD_STRATEGIES), help="計測するロード戦略",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="ロード計測の繰り返し回数")
+    parser.add_argument("--random-seed", type=int, default=42, help="データ生成の乱数シード")
+    parser.add_argument(
+        "--output", type=Path, default=DEFAULT_OUTPUT, help="結果を追記する CSV ファイル"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_at = datetime.now().isoformat(timespec="seconds")
+    git_rev = git_revision()
+
+    print("=== ベンチマーク ===")
+    print(f"ソース          : {BENCH_SRC_CONN_PARAMS['host']}:{BENCH_SRC_CONN_PARAMS['port']} / {BENCH_SRC_DB}")
+    print(f"デスティネーション: {BENCH_DST_CONN_PARAMS['host']}:{BENCH_DST_CONN_PARAMS['port']} / {BENCH_DST_DB}")
+    print(f"規模（日数）    : {args.scales}")
+    print()
+
+    all_rows = []
+    try:
+        recreate_database(loader.DST_CONN_PARAMS, BENCH_DST_DB)
+
+        for scale_days in args.scales:
+            scale_rows = []
+            for engine in args.seeders:
+                print(f"[seed] {engine} / {scale_days} 日分を生成中...")
+                scale_rows += bench_seed(engine, scale_days, args.random_seed)
+
+            for strategy in args.strategies:
+                for repeat in range(1, args.repeat + 1):
+                    print(f"[load] {strategy} / {scale_days} 日分 ({repeat}/{args.repeat})...")
+                    scale_rows += [
+                        {**row, "repeat": repeat} for row in bench_load(strategy)
+                    ]
+
+            scale_rows = [
+                {"run_at": run_at, "git_rev": git_rev, "scale_days": scale_days,
+                 "repeat": 1, **row}
+                for row in scale_rows
+            ]
+            append_results(args.output, scale_rows)
+            all_rows += scale_rows
+
+    except psycopg2.OperationalError as e:
+        print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
+        print(
+            "demo-db および dwh-db コンテナが起動しているか確認してください:"
+            " docker compose up -d",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except psycopg2.Error as e:
+        print(f"\n[エラー] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_summary(all_rows)
+    print()
+    print(f"結果を {args.output} に追記しました")
+    print("=== ベンチマーク完了 ===")
+
+
+if __name__ == "__main__":
+    main()
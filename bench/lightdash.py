@@ -0,0 +1,271 @@
+"""Lightdash クエリ生成モジュール
+
+dbt の marts モデル定義（_marts__models.yml）の Lightdash メタデータ（metrics / dimensions / joins）を読み込み、
+Lightdash が代表的なチャートで発行するのと同じ形の SQL を組み立てます。
+
+ベンチマーク（metrics.py）から利用します。Lightdash の SQL を完全に再現するものではなく、
+走査・結合・集計の形（どのテーブルをどう結合して何で GROUP BY するか）を揃えることを目的とします。
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+MARTS_MODELS_YML = (
+    Path(__file__).parent.parent / "dbt_project" / "models" / "marts" / "_marts__models.yml"
+)
+DBT_PROJECT_YML = Path(__file__).parent.parent / "dbt_project" / "dbt_project.yml"
+
+# dbt の変数で無効にできるモデル（config(enabled=var(...))）→ 変数名
+OPTIONAL_MODELS = {"fct_purchase_wide": "enable_wide_fact"}
+
+# dbt のカスタムスキーマ（target.schema + "_" + "marts"）
+DEFAULT_SCHEMA = "public_marts"
+
+# docker-compose.yml の LIGHTDASH_QUERY_MAX_LIMIT
+QUERY_LIMIT = 5000
+
+_AGGREGATES = {
+    "count": "COUNT({sql})",
+    "count_distinct": "COUNT(DISTINCT {sql})",
+    "sum": "SUM({sql})",
+    "average": "AVG({sql})",
+    "min": "MIN({sql})",
+    "max": "MAX({sql})",
+    "number": "{sql}",
+}
+
+_TIME_TYPES = ("timestamp", "date")
+
+# by_<join> で結合先を分類するディメンション（ダッシュボードで使う値の種類の少ないもの）。
+# 指定の無いモデルは最初の文字列ディメンションを使う（氏名のように値がほぼ一意のものになりうる）
+GROUP_DIMENSIONS = {
+    "dim_member": "status_name",
+    "dim_food": "category_name",
+}
+
+_REFERENCE = re.compile(r"\$\{(\w+)(?:\.(\w+))?\}")
+
+
+@dataclass
+class Dimension:
+    name: str
+    type: str
+    sql: str
+    hidden: bool = False
+
+
+@dataclass
+class Metric:
+    name: str
+    type: str
+    sql: str
+    filters: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class Join:
+    model: str
+    type: str
+    sql_on: str
+    relationship: str | None = None
+
+
+@dataclass
+class Explore:
+    """Lightdash の Explore（1 モデル + 結合先）に相当する定義"""
+    name: str
+    dimensions: dict[str, Dimension]
+    metrics: dict[str, Metric]
+    joins: list[Join]
+
+
+@dataclass
+class ChartQuery:
+    explore: str
+    metric: str
+    shape: str
+    sql: str
+
+
+# ---------------------------------------------------------------------------
+# YAML 読み込み
+# ---------------------------------------------------------------------------
+
+def disabled_models(path: Path = DBT_PROJECT_YML) -> set[str]:
+    """dbt_project.yml の vars で無効にしているモデル名を返す（Lightdash にも Explore は作られない）"""
+    with path.open(encoding="utf-8") as f:
+        variables = yaml.safe_load(f).get("vars", {})
+    return {model for model, var in OPTIONAL_MODELS.items() if not variables.get(var, True)}
+
+
+def load_explores(path: Path = MARTS_MODELS_YML) -> dict[str, Explore]:
+    """モデル定義 YAML を読み込み、モデル名 → Explore の辞書を返す。
+
+    無効にしているモデル（disabled_models）の Explore と、それへの結合は含めない。
+    """
+    with path.open(encoding="utf-8") as f:
+        models = yaml.safe_load(f)["models"]
+    disabled = disabled_models()
+
+    explores = {}
+    for model in models:
+        if model["name"] in disabled:
+            continue
+        meta = model.get("config", {}).get("meta", {})
+        dimensions: dict[str, Dimension] = {}
+        metrics: dict[str, Metric] = {}
+
+        for name, spec in meta.get("metrics", {}).items():
+            metrics[name] = _metric(name, spec, default_sql=None)
+
+        for column in model.get("columns", []):
+            col_meta = column.get("config", {}).get("meta", {})
+            dim_spec = col_meta.get("dimension", {})
+            dimensions[column["name"]] = Dimension(
+                name=column["name"],
+                type=dim_spec.get("type", "string"),
+                sql=dim_spec.get("sql", f"${{TABLE}}.{column['name']}"),
+                hidden=dim_spec.get("hidden", False),
+            )
+            for name, spec in col_meta.get("additional_dimensions", {}).items():
+                dimensions[name] = Dimension(
+                    name=name,
+                    type=spec.get("type", "string"),
+                    sql=spec["sql"],
+                    hidden=spec.get("hidden", False),
+                )
+            for name, spec in col_meta.get("metrics", {}).items():
+                metrics[name] = _metric(name, spec, default_sql=f"${{TABLE}}.{column['name']}")
+
+        joins = [
+            Join(
+                model=j["join"],
+                type=j.get("type", "left"),
+                sql_on=j["sql_on"],
+                relationship=j.get("relationship"),
+            )
+            for j in meta.get("joins", [])
+            if j["join"] not in disabled
+        ]
+        explores[model["name"]] = Explore(model["name"], dimensions, metrics, joins)
+    return explores
+
+
+def _metric(name: str, spec: dict, default_sql: str | None) -> Metric:
+    return Metric(
+        name=name,
+        type=spec["type"],
+        sql=spec.get("sql", default_sql),
+        filters=spec.get("filters", []),
+    )
+
+
+# ---------------------------------------------------------------------------
+# SQL 生成
+# ---------------------------------------------------------------------------
+
+def render_reference(sql: str, table: str) -> str:
+    """${TABLE} / ${model.column} を SQL の識別子に置き換える。"""
+    def replace(match: re.Match) -> str:
+        model, column = match.groups()
+        if column is None:
+            return f'"{table}"' if model == "TABLE" else model
+        return f'"{model}".{column}'
+    return _REFERENCE.sub(replace, sql)
+
+
+def _literal(value) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def metric_sql(explore: Explore, metric: Metric) -> str:
+    """メトリクスの集計式を返す。filters は CASE WHEN で集計対象を絞る。"""
+    sql = render_reference(metric.sql, explore.name)
+    conditions = []
+    for metric_filter in metric.filters:
+        for dim_name, value in metric_filter.items():
+            dim_sql = render_reference(explore.dimensions[dim_name].sql, explore.name)
+            if isinstance(value, list):
+                conditions.append(f"{dim_sql} IN ({', '.join(_literal(v) for v in value)})")
+            else:
+                conditions.append(f"{dim_sql} = {_literal(value)}")
+    if conditions:
+        sql = f"CASE WHEN {' AND '.join(conditions)} THEN {sql} END"
+    return _AGGREGATES[metric.type].format(sql=sql)
+
+
+def _from_clause(explore: Explore, schema: str, joins: list[Join]) -> str:
+    lines = [f'FROM "{schema}"."{explore.name}" AS "{explore.name}"']
+    for join in joins:
+        lines.append(
+            f'{join.type.upper()} JOIN "{schema}"."{join.model}" AS "{join.model}"'
+            f" ON {render_reference(join.sql_on, explore.name)}"
+        )
+    return "\n".join(lines)
+
+
+def _first_dimension(explore: Explore, types: tuple[str, ...]) -> Dimension | None:
+    for dim in explore.dimensions.values():
+        if not dim.hidden and dim.type in types:
+            return dim
+    return None
+
+
+def _group_dimension(explore: Explore) -> Dimension | None:
+    name = GROUP_DIMENSIONS.get(explore.name)
+    if name in explore.dimensions:
+        return explore.dimensions[name]
+    return _first_dimension(explore, ("string",))
+
+
+def chart_queries(
+    explores: dict[str, Explore],
+    schema: str = DEFAULT_SCHEMA,
+) -> list[ChartQuery]:
+    """Explore ごと・メトリクスごとに代表的なチャートの SQL を組み立てる。
+
+    shape:
+      total       : メトリクスの全体値（ビッグナンバー）
+      by_month    : 最初の日時ディメンションの月別推移
+      by_<join>   : 結合先モデルの GROUP_DIMENSIONS のディメンション別（棒グラフ）
+    """
+    queries = []
+    for explore in explores.values():
+        time_dim = _first_dimension(explore, _TIME_TYPES)
+        for metric in explore.metrics.values():
+            select_metric = f'{metric_sql(explore, metric)} AS "{metric.name}"'
+
+            queries.append(ChartQuery(
+                explore.name, metric.name, "total",
+                f"SELECT {select_metric}\n{_from_clause(explore, schema, [])}",
+            ))
+
+            if time_dim is not None:
+                dim_sql = f"DATE_TRUNC('month', {render_reference(time_dim.sql, explore.name)})"
+                queries.append(ChartQuery(
+                    explore.name, metric.name, "by_month",
+                    f'SELECT {dim_sql} AS "{time_dim.name}_month", {select_metric}\n'
+                    f"{_from_clause(explore, schema, [])}\n"
+                    f"GROUP BY 1\nORDER BY 1\nLIMIT {QUERY_LIMIT}",
+                ))
+
+            for join in explore.joins:
+                joined = explores.get(join.model)
+                group_dim = joined and _group_dimension(joined)
+                if not group_dim:
+                    continue
+                dim_sql = render_reference(group_dim.sql, join.model)
+                queries.append(ChartQuery(
+                    explore.name, metric.name, f"by_{join.model}",
+                    f'SELECT {dim_sql} AS "{join.model}_{group_dim.name}", {select_metric}\n'
+                    f"{_from_clause(explore, schema, [join])}\n"
+                    f"GROUP BY 1\nORDER BY 2 DESC\nLIMIT {QUERY_LIMIT}",
+                ))
+    return queries
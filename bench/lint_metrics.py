@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""Lightdash メトリクス・結合定義のクエリコスト リンター
+
+_marts__models.yml の Lightdash メタデータ（metrics / joins）を読み込み（lightdash.py）、
+DWH の marts に対して重くなりやすい定義・結果を誤らせる定義を検出します。
+metrics.py と違いクエリは実行せず、EXPLAIN（ANALYZE なし）の推定コストと統計情報だけを使います。
+
+実行前提:
+  - docker-compose.yml の dwh-db コンテナが起動していること
+  - dbt run を実行済みであること
+  - プロジェクトルートに .env.local ファイルが存在すること
+
+処理内容:
+  1. count_distinct メトリクスのうち、件数の多いテーブル（最も粒度の細かいモデル）に対するものを検出する
+  2. joins の sql_on の結合先カラムに、そのカラムを先頭にしたインデックスが無いものを検出する
+  3. relationship の「1」側の結合キーに重複があるもの（ファンアウトして集計値が膨らむ）を検出する
+  4. メトリクスごとに代表的なチャートの SQL を EXPLAIN し、推定コストを表示する
+     （コストが閾値を超えるものを検出する）
+
+  error の検出があれば終了コード 1 で終了する（--strict を指定すると warn でも 1）。
+
+使い方:
+  uv run python bench/lint_metrics.py
+  uv run python bench/lint_metrics.py --large-rows 500000 --max-cost 50000 --strict
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+
+import psycopg2
+
+import bench
+import lightdash
+
+DEFAULT_LARGE_ROWS = 1_000_000
+DEFAULT_MAX_COST = 100_000
+
+# sql_on の等値条件（${model.column} = ${model.column}）
+_EQUALITY = re.compile(r"\$\{(\w+)\.(\w+)\}\s*=\s*\$\{(\w+)\.(\w+)\}")
+
+# relationship ごとに、結合キーが一意でなければならない側（base: Explore 側、joined: 結合先）
+_UNIQUE_SIDES = {
+    "many-to-one": ("joined",),
+    "one-to-many": ("base",),
+    "one-to-one": ("base", "joined"),
+    "many-to-many": (),
+}
+
+
+@dataclass
+class Finding:
+    level: str      # error / warn
+    explore: str
+    target: str     # メトリクス名または結合先モデル名
+    rule: str
+    message: str
+
+
+@dataclass
+class MetricCost:
+    explore: str
+    metric: str
+    shape: str      # 最もコストの高いチャートの形
+    total_cost: float
+    plan_rows: int
+
+
+# ---------------------------------------------------------------------------
+# DWH の統計情報
+# ---------------------------------------------------------------------------
+
+def estimated_rows(cur: psycopg2.extensions.cursor, schema: str, relation: str) -> int | None:
+    """テーブルの推定件数（reltuples）を返す。テーブルが無い場合は None。"""
+    cur.execute("SELECT to_regclass(%s)::oid", (f'"{schema}"."{relation}"',))
+    oid = cur.fetchone()[0]
+    if oid is None:
+        return None
+    # パーティションテーブルは配下のパーティションを合計する（通常のテーブルは自身だけが返る）
+    cur.execute(
+        """
+        SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+        FROM pg_partition_tree(%s::regclass) t
+        JOIN pg_class c ON c.oid = t.relid
+        WHERE t.isleaf
+        """,
+        (oid,),
+    )
+    return cur.fetchone()[0]
+
+
+def has_leading_index(
+    cur: psycopg2.extensions.cursor, schema: str, relation: str, column: str
+) -> bool:
+    """column を先頭カラムにしたインデックスがあるかを返す（パーティションテーブルは親のインデックス）"""
+    cur.execute(
+        """
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = to_regclass(%s)
+              AND a.attname = %s
+        )
+        """,
+        (f'"{schema}"."{relation}"', column),
+    )
+    return cur.fetchone()[0]
+
+
+def duplicate_keys(
+    cur: psycopg2.extensions.cursor, schema: str, relation: str, columns: list[str]
+) -> int:
+    """結合キー（NULL を除く）のうち、2 行以上に現れる値の数を返す"""
+    cols = ", ".join(f'"{c}"' for c in columns)
+    not_null = " AND ".join(f'"{c}" IS NOT NULL' for c in columns)
+    cur.execute(
+        f"""
+        SELECT COUNT(*)
+        FROM (
+            SELECT {cols}
+            FROM "{schema}"."{relation}"
+            WHERE {not_null}
+            GROUP BY {cols}
+            HAVING COUNT(*) > 1
+        ) d
+        """
+    )
+    return cur.fetchone()[0]
+
+
+def explain_cost(cur: psycopg2.extensions.cursor, sql: str) -> tuple[float, int]:
+    """EXPLAIN (FORMAT JSON) の最上位ノードの推定コストと推定行数を返す"""
+    cur.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    top = plan[0]["Plan"]
+    return top["Total Cost"], top["Plan Rows"]
+
+
+# ---------------------------------------------------------------------------
+# 検査
+# ---------------------------------------------------------------------------
+
+def join_keys(explore: lightdash.Explore, join: lightdash.Join) -> dict[str, list[str]] | None:
+    """sql_on の等値条件から {"base": [カラム], "joined": [カラム]} を返す。解釈できない場合は None。"""
+    keys = {"base": [], "joined": []}
+    sides = {explore.name: "base", join.model: "joined"}
+    for left_model, left_col, right_model, right_col in _EQUALITY.findall(join.sql_on):
+        if {left_model, right_model} != set(sides):
+            return None
+        keys[sides[left_model]].append(left_col)
+        keys[sides[right_model]].append(right_col)
+    if not keys["base"]:
+        return None
+    return keys
+
+
+def lint_count_distinct(
+    explores: dict[str, lightdash.Explore],
+    rows: dict[str, int | None],
+    large_rows: int,
+) -> list[Finding]:
+    """件数の多いテーブルに対する count_distinct を検出する。
+
+    最も件数の多い Explore（最も粒度の細かいモデル）と、large_rows 件以上の Explore が対象。
+    """
+    known = {name: n for name, n in rows.items() if n is not None}
+    largest = max(known, key=known.get) if known else None
+
+    findings = []
+    for explore in explores.values():
+        n = rows.get(explore.name)
+        if n is None or (explore.name != largest and n < large_rows):
+            continue
+        for metric in explore.metrics.values():
+            if metric.type != "count_distinct":
+                continue
+            reason = "最も件数の多いモデル" if explore.name == largest else f"{large_rows:,} 件以上"
+            findings.append(Finding(
+                "warn", explore.name, metric.name, "count_distinct_large_grain",
+                f"{n:,} 件（{reason}）に対する COUNT DISTINCT です。"
+                "粒度の粗いモデルでの count、または HLL スケッチ（hll_union_agg）を検討してください",
+            ))
+    return findings
+
+
+def lint_joins(
+    cur: psycopg2.extensions.cursor,
+    explores: dict[str, lightdash.Explore],
+    schema: str,
+) -> list[Finding]:
+    """結合先のインデックスの有無と、relationship どおりの一意性を検査する"""
+    findings = []
+    for explore in explores.values():
+        for join in explore.joins:
+            keys = join_keys(explore, join)
+            if keys is None:
+                findings.append(Finding(
+                    "warn", explore.name, join.model, "join_unparsed",
+                    f"sql_on を等値条件として解釈できないため検査しません: {join.sql_on}",
+                ))
+                continue
+            tables = {"base": explore.name, "joined": join.model}
+
+            for column in keys["joined"]:
+                if not has_leading_index(cur, schema, join.model, column):
+                    findings.append(Finding(
+                        "warn", explore.name, join.model, "join_missing_index",
+                        f"結合先 {join.model}.{column} を先頭にしたインデックスがありません",
+                    ))
+
+            if join.relationship is None:
+                findings.append(Finding(
+                    "warn", explore.name, join.model, "join_relationship_missing",
+                    "relationship が定義されていないため、ファンアウトを検査できません",
+                ))
+                continue
+            for side in _UNIQUE_SIDES.get(join.relationship, ()):
+                duplicates = duplicate_keys(cur, schema, tables[side], keys[side])
+                if duplicates:
+                    findings.append(Finding(
+                        "error", explore.name, join.model, "join_fan_out",
+                        f"relationship が {join.relationship} ですが、"
+                        f"{tables[side]}({', '.join(keys[side])}) に重複する値が {duplicates:,} 件あります"
+                        "（結合すると行が増え、集計値が膨らみます）",
+                    ))
+    return findings
+
+
+def lint_costs(
+    cur: psycopg2.extensions.cursor,
+    explores: dict[str, lightdash.Explore],
+    schema: str,
+    max_cost: float,
+) -> tuple[list[MetricCost], list[Finding]]:
+    """メトリクスごとに代表的なチャートを EXPLAIN し、最もコストの高いチャートを返す"""
+    costs: dict[tuple[str, str], MetricCost] = {}
+    findings = []
+    for query in lightdash.chart_queries(explores, schema):
+        try:
+            total_cost, plan_rows = explain_cost(cur, query.sql)
+        except psycopg2.Error as e:
+            cur.connection.rollback()
+            findings.append(Finding(
+                "error", query.explore, query.metric, "explain_failed",
+                f"{query.shape}: {str(e).strip().splitlines()[0]}",
+            ))
+            continue
+        key = (query.explore, query.metric)
+        if key not in costs or total_cost > costs[key].total_cost:
+            costs[key] = MetricCost(query.explore, query.metric, query.shape, total_cost, plan_rows)
+
+    for cost in costs.values():
+        if cost.total_cost > max_cost:
+            findings.append(Finding(
+                "warn", cost.explore, cost.metric, "metric_expensive",
+                f"{cost.shape} の推定コストが {cost.total_cost:,.0f} です（閾値 {max_cost:,.0f}）",
+            ))
+    return sorted(costs.values(), key=lambda c: c.total_cost, reverse=True), findings
+
+
+# ---------------------------------------------------------------------------
+# メイン処理
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lightdash メトリクス・結合定義のクエリコスト リンター")
+    parser.add_argument("--schema", default=lightdash.DEFAULT_SCHEMA, help="marts のスキーマ")
+    parser.add_argument(
+        "--bench", action="store_true",
+        help="dbt_warehouse ではなく dwh-bench（metrics.py --scales でビルドしたもの）を検査する",
+    )
+    parser.add_argument(
+        "--large-rows", type=int, default=DEFAULT_LARGE_ROWS,
+        help="count_distinct を検出する件数の閾値（最も件数の多いモデルは常に対象）",
+    )
+    parser.add_argument(
+        "--max-cost", type=float, default=DEFAULT_MAX_COST,
+        help="メトリクスの推定コストの閾値（EXPLAIN の Total Cost）",
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="warn の検出でも終了コード 1 で終了する"
+    )
+    return parser.parse_args()
+
+
+def print_report(costs: list[MetricCost], findings: list[Finding]) -> None:
+    print()
+    print(f"{'explore':<26} {'metric':<28} {'shape':<16} {'cost':>12} {'rows':>8}")
+    for cost in costs:
+        print(
+            f"{cost.explore:<26} {cost.metric:<28} {cost.shape:<16} "
+            f"{cost.total_cost:>12,.0f} {cost.plan_rows:>8}"
+        )
+
+    print()
+    if not findings:
+        print("検出はありません")
+        return
+    for finding in sorted(findings, key=lambda f: (f.level != "error", f.explore, f.target)):
+        print(f"[{finding.level}] {finding.explore} / {finding.target} ({finding.rule})")
+        print(f"    {finding.message}")
+
+
+def main() -> None:
+    args = parse_args()
+    conn_params = bench.BENCH_DST_CONN_PARAMS if args.bench else bench.loader.DST_CONN_PARAMS
+
+    print("=== Lightdash メトリクス リンター ===")
+    print(f"  対象: {conn_params['dbname']}.{args.schema}")
+
+    explores = lightdash.load_explores()
+    disabled = lightdash.disabled_models()
+    if disabled:
+        print(f"  無効なモデル（対象外）: {', '.join(sorted(disabled))}")
+    try:
+        conn = psycopg2.connect(**conn_params)
+        try:
+            cur = conn.cursor()
+            rows = {name: estimated_rows(cur, args.schema, name) for name in explores}
+            missing = [name for name, n in rows.items() if n is None]
+            if missing:
+                print(f"\n[エラー] テーブルがありません: {', '.join(missing)}", file=sys.stderr)
+                print("dbt run を実行済みか確認してください", file=sys.stderr)
+                sys.exit(1)
+
+            findings = lint_count_distinct(explores, rows, args.large_rows)
+            findings += lint_joins(cur, explores, args.schema)
+            costs, cost_findings = lint_costs(cur, explores, args.schema, args.max_cost)
+            findings += cost_findings
+        finally:
+            conn.close()
+    except psycopg2.OperationalError as e:
+        print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
+        print(
+            "dwh-db コンテナが起動しているか確認してください: docker compose up -d dwh-db",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except psycopg2.Error as e:
+        print(f"\n[エラー] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_report(costs, findings)
+
+    errors = sum(1 for f in findings if f.level == "error")
+    warnings = len(findings) - errors
+    print()
+    print(f"error {errors} 件、warn {warnings} 件")
+    print("=== リンター完了 ===")
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
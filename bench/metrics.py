@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Lightdash メトリクスクエリ ベンチマークツール
+
+_marts__models.yml の Lightdash メタデータから代表的なチャートの SQL を組み立て（lightdash.py）、
+DWH に対して EXPLAIN (ANALYZE, BUFFERS) を実行して実行時間・走査行数・バッファヒット数を計測します。
+
+実行前提:
+  - docker-compose.yml の dwh-db コンテナが起動していること
+  - dbt run を実行済みであること（--scales を指定した場合は不要）
+  - プロジェクトルートに .env.local ファイルが存在すること
+
+処理内容:
+  --scales を指定しない場合:
+    現在の DWH（dbt_warehouse）の marts に対してクエリを計測する
+  --scales を指定した場合:
+    規模ごとに bench.py と同じ手順で dwh-bench にデータを用意し、dbt run --target bench で
+    marts をビルドしてからクエリを計測する
+  計測結果は CSV ファイルに追記する
+
+使い方:
+  uv run python bench/metrics.py
+  uv run python bench/metrics.py --scales 30 180 365 --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+
+import bench
+import lightdash
+
+DBT_PROJECT_DIR = bench.PROJECT_ROOT / "dbt_project"
+DEFAULT_OUTPUT = Path(__file__).parent / "metrics_results.csv"
+
+RESULT_FIELDS = [
+    "run_at",
+    "git_rev",
+    "target",
+    "scale_days",
+    "repeat",
+    "explore",
+    "metric",
+    "shape",
+    "base_rows",
+    "execution_ms",
+    "planning_ms",
+    "rows_scanned",
+    "shared_hit",
+    "shared_read",
+    "error",
+]
+
+
+# ---------------------------------------------------------------------------
+# EXPLAIN 結果の解析
+# ---------------------------------------------------------------------------
+
+def _walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def summarize_plan(explain: list[dict]) -> dict:
+    """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) の結果から計測値を取り出す。
+
+    rows_scanned はスキャンノードが読んだ行数（フィルタで除外された行を含む）の合計。
+    バッファ数は最上位ノードの値（子ノードの分を含む累計）。
+    """
+    root = explain[0]
+    top = root["Plan"]
+    rows_scanned = 0
+    for node in _walk(top):
+        if node["Node Type"].endswith("Scan"):
+            loops = node.get("Actual Loops", 1)
+            rows_scanned += (
+                node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)
+            ) * loops
+    return {
+        "execution_ms": root["Execution Time"],
+        "planning_ms": root["Planning Time"],
+        "rows_scanned": rows_scanned,
+        "shared_hit": top.get("Shared Hit Blocks", 0),
+        "shared_read": top.get("Shared Read Blocks", 0),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 計測
+# ---------------------------------------------------------------------------
+
+def base_row_counts(
+    cur: psycopg2.extensions.cursor, schema: str, explores: list[str]
+) -> dict[str, int | None]:
+    """Explore のベーステーブルの件数（データ規模の記録用）を取得する"""
+    counts = {}
+    for name in explores:
+        try:
+            cur.execute(f'SELECT COUNT(*) FROM "{schema}"."{name}"')
+            counts[name] = cur.fetchone()[0]
+        except psycopg2.Error:
+            cur.connection.rollback()
+            counts[name] = None
+    return counts
+
+
+def run_queries(conn_params: dict, schema: str, repeat: int) -> list[dict]:
+    """全チャートのクエリを EXPLAIN ANALYZE で実行し、計測結果を返す"""
+    explores = lightdash.load_explores()
+    queries = lightdash.chart_queries(explores, schema)
+
+    results = []
+    conn = psycopg2.connect(**conn_params)
+    try:
+        cur = conn.cursor()
+        counts = base_row_counts(cur, schema, list(explores))
+        for query in queries:
+            for i in range(1, repeat + 1):
+                row = {
+                    "repeat": i,
+                    "explore": query.explore,
+                    "metric": query.metric,
+                    "shape": query.shape,
+                    "base_rows": counts[query.explore],
+                }
+                try:
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.sql}")
+                    plan = cur.fetchone()[0]
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    row.update(summarize_plan(plan))
+                except psycopg2.Error as e:
+                    row["error"] = str(e).strip().splitlines()[0]
+                conn.rollback()
+                results.append(row)
+    finally:
+        conn.close()
+    return results
+
+
+def build_marts_for_scale(scale_days: int, random_seed: int) -> None:
+    """dwh-bench に規模に応じたデータを用意し、dbt run --target bench で marts をビルドする"""
+    from dbt.cli.main import dbtRunner
+
+    bench.bench_seed("python", scale_days, random_seed)
+    bench.bench_load("execute_values")
+
+    result = dbtRunner().invoke([
+        "run", "--full-refresh", "--target", "bench",
+        "--project-dir", str(DBT_PROJECT_DIR),
+        "--profiles-dir", str(DBT_PROJECT_DIR),
+    ])
+    if not result.success:
+        raise RuntimeError(f"dbt run に失敗しました: {result.exception}")
+
+
+# ---------------------------------------------------------------------------
+# メイン処理
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lightdash メトリクスクエリのベンチマーク")
+    parser.add_argument(
+        "--scales", type=int, nargs="+",
+        help="シミュレーション日数のリスト（指定した場合は dwh-bench にデータを作って計測する）",
+    )
+    parser.add_argument("--schema", default=lightdash.DEFAULT_SCHEMA, help="marts のスキーマ")
+    parser.add_argument("--repeat", type=int, default=1, help="クエリごとの繰り返し回数")
+    parser.add_argument("--random-seed", type=int, default=42, help="データ生成の乱数シード")
+    parser.add_argument(
+        "--output", type=Path, default=DEFAULT_OUTPUT, help="結果を追記する CSV ファイル"
+    )
+    parser.add_argument(
+        "--show-sql", action="store_true", help="計測せずに生成した SQL を表示する"
+    )
+    return parser.parse_args()
+
+
+def print_summary(rows: list[dict]) -> None:
+    print()
+    print(f"{'explore':<22} {'metric':<22} {'shape':<16} {'ms':>9} {'scanned':>10} {'hit':>8} {'read':>8}")
+    for row in rows:
+        if row.get("error"):
+            print(f"{row['explore']:<22} {row['metric']:<22} {row['shape']:<16} [エラー] {row['error']}")
+            continue
+        print(
+            f"{row['explore']:<22} {row['metric']:<22} {row['shape']:<16} "
+            f"{row['execution_ms']:>9.2f} {row['rows_scanned']:>10} "
+            f"{row['shared_hit']:>8} {row['shared_read']:>8}"
+        )
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.show_sql:
+        for query in lightdash.chart_queries(lightdash.load_explores(), args.schema):
+            print(f"-- {query.explore} / {query.metric} / {query.shape}")
+            print(query.sql + ";")
+            print()
+        return
+
+    run_at = datetime.now().isoformat(timespec="seconds")
+    git_rev = bench.git_revision()
+
+    print("=== Lightdash メトリクスクエリ ベンチマーク ===")
+    all_rows = []
+    try:
+        if args.scales:
+            bench.recreate_database(bench.loader.DST_CONN_PARAMS, bench.BENCH_DST_DB)
+            targets = [(scale, "bench", bench.BENCH_DST_CONN_PARAMS) for scale in args.scales]
+        else:
+            targets = [("", "dwh", bench.loader.DST_CONN_PARAMS)]
+
+        for scale_days, target, conn_params in targets:
+            if scale_days:
+                print(f"[build] {scale_days} 日分のデータで marts をビルド中...")
+                build_marts_for_scale(scale_days, args.random_seed)
+            print(f"[query] {conn_params['dbname']}.{args.schema} に対して計測中...")
+            started = time.perf_counter()
+            rows = [
+                {"run_at": run_at, "git_rev": git_rev, "target": target,
+                 "scale_days": scale_days, **row}
+                for row in run_queries(conn_params, args.schema, args.repeat)
+            ]
+            print(f"  {len(rows)} クエリ / {time.perf_counter() - started:.1f} 秒")
+            bench.append_results(args.output, rows, RESULT_FIELDS)
+            all_rows += rows
+
+    except psycopg2.OperationalError as e:
+        print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
+        print(
+            "dwh-db コンテナが起動しているか確認してください: docker compose up -d dwh-db",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"\n[エラー] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_summary(all_rows)
+    print()
+    print(f"結果を {args.output} に追記しました")
+    print("=== ベンチマーク完了 ===")
+
+
+if __name__ == "__main__":
+    main()
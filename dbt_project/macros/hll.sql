@@ -0,0 +1,122 @@
+{#
+    HyperLogLog スケッチ（近似ユニーク数）のマクロと SQL 関数。
+
+    集計テーブルに日 × ディメンションごとのスケッチを bytea で持たせ、Lightdash のクエリ時に
+    任意の期間・ディメンションでマージして近似ユニーク数を求める（COUNT DISTINCT の代わり）。
+
+    - スケッチは 2^hll_precision 個のレジスタ（1 レジスタ 1 バイト）の bytea
+    - 要素のハッシュは hashint8extended（64 ビット）。上位 hll_precision ビットがレジスタ番号、
+      残りのビットの先頭の 1 の位置がレジスタ値（rho）
+    - 拡張機能は使わず、SQL 関数・集約関数だけで実装する（on-run-start で target.schema に作成）
+
+    モデルでの作り方:
+        1. 要素ごとに hll_register / hll_rho を求め、(グループ, レジスタ) ごとに rho の最大値に集約する
+        2. グループごとに hll_register_agg(register, rho) でスケッチにする
+
+    クエリでの使い方:
+        hll_estimate(hll_union_agg(sketch))
+
+    hll_precision を変えた場合は、スケッチを持つモデルを --full-refresh で作り直すこと。
+#}
+
+{% macro hll_precision() -%}
+    {%- set precision = var('hll_precision', 10) | int -%}
+    {%- if precision < 4 or precision > 16 -%}
+        {{ exceptions.raise_compiler_error("hll_precision は 4〜16 で指定してください: " ~ precision) }}
+    {%- endif -%}
+    {{ return(precision) }}
+{%- endmacro %}
+
+
+{% macro hll_hash(expr) -%}
+    hashint8extended(({{ expr }})::bigint, 0)
+{%- endmacro %}
+
+
+{% macro hll_register(expr) -%}
+    {%- set precision = hll_precision() -%}
+    ((({{ hll_hash(expr) }}) >> {{ 64 - precision }}) & {{ 2 ** precision - 1 }})::integer
+{%- endmacro %}
+
+
+{% macro hll_rho(expr) -%}
+    {%- set precision = hll_precision() -%}
+    coalesce(
+        nullif(position(B'1' in substring(({{ hll_hash(expr) }})::bit(64) from {{ precision + 1 }})), 0),
+        {{ 64 - precision + 1 }}
+    )
+{%- endmacro %}
+
+
+{% macro create_hll_functions(schema=target.schema) %}
+    {%- set registers = 2 ** hll_precision() -%}
+
+    -- 複数のスケッチをレジスタごとの最大値でマージする
+    create or replace function {{ schema }}.hll_union_all(sketches bytea[])
+    returns bytea
+    language sql immutable parallel safe
+    as $$
+        select decode(string_agg(lpad(to_hex(rho), 2, '0'), '' order by register), 'hex')
+        from (
+            select i as register, max(get_byte(s, i)) as rho
+            from unnest(sketches) as s
+            cross join lateral generate_series(0, length(s) - 1) as i
+            group by i
+        ) r
+    $$;
+
+    create or replace function {{ schema }}.hll_union(a bytea, b bytea)
+    returns bytea
+    language sql immutable parallel safe
+    as $$
+        select {{ schema }}.hll_union_all(array[a, b])
+    $$;
+
+    -- スケッチを配列に溜めておき、最後に一度だけマージする（行ごとにマージするより速い）
+    create or replace aggregate {{ schema }}.hll_union_agg(bytea) (
+        sfunc = array_append,
+        stype = bytea[],
+        finalfunc = {{ schema }}.hll_union_all,
+        combinefunc = array_cat,
+        initcond = '{}',
+        parallel = safe
+    );
+
+    -- strict: レジスタ番号・rho が NULL の行（ハッシュ対象が NULL）は読み飛ばし、それまでのスケッチを保つ
+    create or replace function {{ schema }}.hll_add_register(sketch bytea, register integer, rho integer)
+    returns bytea
+    language sql immutable strict parallel safe
+    as $$
+        select set_byte(sketch, register, greatest(get_byte(sketch, register), rho))
+    $$;
+
+    -- (レジスタ番号, rho) の組からスケッチを作る
+    create or replace aggregate {{ schema }}.hll_register_agg(integer, integer) (
+        sfunc = {{ schema }}.hll_add_register,
+        stype = bytea,
+        combinefunc = {{ schema }}.hll_union,
+        initcond = '\x{{ "00" * registers }}',
+        parallel = safe
+    );
+
+    -- 推定値（少数のときは linear counting で補正する）
+    create or replace function {{ schema }}.hll_estimate(sketch bytea)
+    returns bigint
+    language sql immutable parallel safe
+    as $$
+        select coalesce(round(
+            case
+                when zeros > 0 and raw <= 2.5 * m then m * ln(m / zeros)
+                else raw
+            end
+        )::bigint, 0)
+        from (
+            select
+                nullif(count(*), 0)::float8 as m,
+                0.7213 / (1 + 1.079 / nullif(count(*), 0)) * power(nullif(count(*), 0), 2)
+                    / sum(power(2::float8, -get_byte(sketch, i))) as raw,
+                count(*) filter (where get_byte(sketch, i) = 0)::float8 as zeros
+            from generate_series(0, length(sketch) - 1) as i
+        ) r
+    $$;
+{% endmacro %}
@@ -0,0 +1,162 @@
+{#
+    月単位のレンジパーティションテーブルを作る Postgres 用マテリアライゼーション。
+
+    - 親テーブルを partition by range (partition_by.field) で作成し、月ごとに子パーティションを持つ
+    - 実行のたびに月ごとのフィンガープリントを計算し、
+      前回ビルド時（<モデル名>__partition_state に保存）から変わった月のパーティションだけを作り直す
+      （モデル SQL を流すのは作り直す月だけ）
+    - フィンガープリントは partition_fingerprint_macro のクエリで求める。指定が無い場合は
+      モデル SQL の結果を全期間で集計する（毎回全期間の SQL が流れるため、大きなモデルではマクロを指定すること）
+    - ソースから消えた月のパーティションは削除する
+    - 親テーブルが無い・パーティションテーブルでない・--full-refresh の場合は全件作り直す
+    - indexes config のインデックスは親テーブルに作成する（子パーティションにも自動で作られる）。
+      パーティションキーを含まない一意インデックスは作れないので unique は指定しないこと
+    - パーティションキーが NULL の行は格納しない
+
+    config:
+        partition_by: {'field': 'purchased_at'}
+        partition_fingerprint_macro: (partition_start, fingerprint) を返すクエリのマクロ名
+            （adapter.dispatch で呼ぶため default__<名前> で定義する。macros/partition_fingerprints.sql）
+        partition_fingerprint: マクロを指定しない場合に、モデル SQL の結果に対して使う集計式
+            （デフォルト: count(*)::text）
+#}
+{% materialization partitioned_table, adapter='postgres' %}
+    {%- set target_relation = this.incorporate(type='table') -%}
+    {%- set existing_relation = load_cached_relation(this) -%}
+    {%- set partition_field = config.require('partition_by')['field'] -%}
+    {%- set fingerprint_macro = config.get('partition_fingerprint_macro') -%}
+    {%- set fingerprint_expr = config.get('partition_fingerprint', default='count(*)::text') -%}
+    {%- set state_relation = this.incorporate(path={'identifier': this.identifier ~ '__partition_state'}) -%}
+    {%- set shape_relation = make_temp_relation(this, '__shape') -%}
+    {%- set fingerprint_relation = make_temp_relation(this, '__fingerprint') -%}
+
+    {%- set is_partitioned = false -%}
+    {%- if existing_relation is not none -%}
+        {%- set partitioned_query -%}
+            select count(*) from pg_partitioned_table
+            where partrelid = '{{ target_relation.include(database=false) }}'::regclass
+        {%- endset -%}
+        {%- set is_partitioned = run_query(partitioned_query).columns[0].values()[0] > 0 -%}
+    {%- endif -%}
+    {%- set full_refresh = should_full_refresh() or not is_partitioned -%}
+
+    {{ run_hooks(pre_hooks, inside_transaction=False) }}
+    {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+    {% if full_refresh %}
+        {% if existing_relation is not none %}
+            {% do adapter.drop_relation(existing_relation) %}
+        {% endif %}
+        {% call statement('create_parent') %}
+            drop table if exists {{ state_relation }};
+
+            create temporary table {{ shape_relation }} as
+            select * from ({{ sql }}) as model_sql limit 0;
+
+            create table {{ target_relation }} (like {{ shape_relation }})
+            partition by range ({{ partition_field }});
+
+            create table {{ state_relation }} (
+                partition_start date primary key,
+                fingerprint text not null,
+                rebuilt_at timestamp not null default now()
+            );
+        {% endcall %}
+        {% do create_indexes(target_relation) %}
+    {% endif %}
+
+    {% call statement('compute_fingerprint') %}
+        create temporary table {{ fingerprint_relation }} as
+        {% if fingerprint_macro %}
+        {{ adapter.dispatch(fingerprint_macro)() }}
+        {% else %}
+        select
+            date_trunc('month', {{ partition_field }})::date as partition_start,
+            {{ fingerprint_expr }} as fingerprint
+        from ({{ sql }}) as model_sql
+        where {{ partition_field }} is not null
+        group by 1
+        {% endif %}
+    {% endcall %}
+
+    {%- set changed_query -%}
+        select f.partition_start, false as is_removed
+        from {{ fingerprint_relation }} f
+        left join {{ state_relation }} s on s.partition_start = f.partition_start
+        where s.fingerprint is distinct from f.fingerprint
+        union all
+        select s.partition_start, true as is_removed
+        from {{ state_relation }} s
+        left join {{ fingerprint_relation }} f on f.partition_start = s.partition_start
+        where f.partition_start is null
+        order by 1
+    {%- endset -%}
+    {%- set changed_partitions = run_query(changed_query).rows -%}
+
+    {% for partition_start, is_removed in changed_partitions %}
+        {%- set partition_end = modules.datetime.date(
+            partition_start.year + partition_start.month // 12,
+            partition_start.month % 12 + 1,
+            1
+        ) -%}
+        {%- set partition_relation = this.incorporate(
+            path={'identifier': this.identifier ~ '_p' ~ partition_start.strftime('%Y%m')}
+        ) -%}
+        {{ log("  partition " ~ partition_relation.identifier ~ (" を削除" if is_removed else " を再構築"), info=true) }}
+        {% call statement('rebuild_partition_' ~ loop.index) %}
+            {% if is_removed %}
+                drop table if exists {{ partition_relation }};
+            {% else %}
+                create table if not exists {{ partition_relation }}
+                partition of {{ target_relation }}
+                for values from ('{{ partition_start }}') to ('{{ partition_end }}');
+
+                {% if not full_refresh %}
+                truncate table {{ partition_relation }};
+
+                insert into {{ partition_relation }}
+                select * from ({{ sql }}) as model_sql
+                where {{ partition_field }} >= '{{ partition_start }}'
+                  and {{ partition_field }} < '{{ partition_end }}';
+                {% endif %}
+            {% endif %}
+        {% endcall %}
+    {% endfor %}
+
+    {% if full_refresh %}
+        {#- 全件作り直しの場合はパーティションごとに SQL を流さず、親テーブルに一度で投入する -#}
+        {% call statement('insert_all') %}
+            insert into {{ target_relation }}
+            select * from ({{ sql }}) as model_sql
+            where {{ partition_field }} is not null
+        {% endcall %}
+    {% endif %}
+
+    {% call statement('main') %}
+        delete from {{ state_relation }} s
+        where not exists (
+            select 1 from {{ fingerprint_relation }} f
+            where f.partition_start = s.partition_start
+        );
+
+        insert into {{ state_relation }} as s (partition_start, fingerprint, rebuilt_at)
+        select partition_start, fingerprint, now()
+        from {{ fingerprint_relation }}
+        on conflict (partition_start) do update
+        set fingerprint = excluded.fingerprint,
+            rebuilt_at = excluded.rebuilt_at
+        where s.fingerprint is distinct from excluded.fingerprint;
+
+        drop table {{ fingerprint_relation }};
+    {% endcall %}
+
+    {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+    {% do persist_docs(target_relation, model) %}
+
+    {{ adapter.commit() }}
+
+    {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+    {{ return({'relations': [target_relation]}) }}
+{% endmaterialization %}
@@ -0,0 +1,38 @@
+{#
+    会員属性の導出・コード値のラベル変換マクロ。
+    marts でビルド時に計算してカラムとして持たせ、Lightdash のクエリ時に CASE 式を評価しないようにする。
+#}
+
+{% macro age_years(birth_date, as_of) -%}
+    date_part('year', age({{ as_of }}, {{ birth_date }}))::smallint
+{%- endmacro %}
+
+
+{% macro age_band(birth_date, as_of) -%}
+    case
+        when {{ age_years(birth_date, as_of) }} < 20 then '10代'
+        when {{ age_years(birth_date, as_of) }} < 30 then '20代'
+        when {{ age_years(birth_date, as_of) }} < 40 then '30代'
+        when {{ age_years(birth_date, as_of) }} < 50 then '40代'
+        when {{ age_years(birth_date, as_of) }} < 60 then '50代'
+        else '60代以上'
+    end
+{%- endmacro %}
+
+
+{% macro gender_name(gender) -%}
+    case {{ gender }}
+        when 0 then '男'
+        when 1 then '女'
+        when 2 then 'それ以外'
+    end
+{%- endmacro %}
+
+
+{% macro status_name(status) -%}
+    case {{ status }}
+        when 0 then '無料会員'
+        when 1 then '有料会員'
+        when 9 then '退会'
+    end
+{%- endmacro %}
@@ -0,0 +1,42 @@
+{#
+    marts テーブルのビルド後に実行する post-hook 用マクロ。
+
+    - モデルの config に cluster_by（カラム名）がある場合、そのカラムを先頭に持つ
+      btree インデックス（indexes config で宣言したもの）で CLUSTER する。
+      インクリメンタルモデル・パーティションテーブルは全件再構築時（--full-refresh）のみ CLUSTER する。
+    - 最後に ANALYZE して、作成したインデックスを前提とした統計情報を更新する。
+
+    使い方（dbt_project.yml で marts 全体に設定済み）:
+        +post-hook: "{{ optimize_table() }}"
+#}
+{% macro optimize_table(relation=this) %}
+    {%- set cluster_by = model.config.get('cluster_by') -%}
+    {%- set is_rebuild = model.config.get('materialized') not in ('incremental', 'partitioned_table') or flags.FULL_REFRESH -%}
+    {%- if execute and cluster_by and is_rebuild %}
+        cluster {{ relation }} using {{ adapter.quote(find_btree_index(relation, cluster_by)) }};
+    {%- endif %}
+    analyze {{ relation }};
+{% endmacro %}
+
+
+{% macro find_btree_index(relation, column_name) %}
+    {%- set index_query -%}
+        select i.relname
+        from pg_index x
+        join pg_class i on i.oid = x.indexrelid
+        join pg_am am on am.oid = i.relam
+        join pg_attribute a on a.attrelid = x.indrelid and a.attnum = x.indkey[0]
+        where x.indrelid = '{{ relation.include(database=false) }}'::regclass
+          and am.amname = 'btree'
+          and a.attname = '{{ column_name }}'
+        order by x.indisunique desc, i.relname
+        limit 1
+    {%- endset -%}
+    {%- set index_names = run_query(index_query).columns[0].values() -%}
+    {%- if not index_names -%}
+        {{ exceptions.raise_compiler_error(
+            relation ~ ": cluster_by='" ~ column_name ~ "' を先頭カラムに持つ btree インデックスを indexes に宣言してください"
+        ) }}
+    {%- endif -%}
+    {{ return(index_names[0]) }}
+{% endmacro %}
@@ -0,0 +1,20 @@
+{#
+    partitioned_table マテリアライゼーションの partition_fingerprint_macro に指定する、
+    月ごとのフィンガープリントのクエリ（partition_start, fingerprint を返す）。
+
+    モデル SQL 全体（結合を含む）を全期間で流さずに済むよう、ソース側の安い集計で変更を検知する。
+    adapter.dispatch で呼び出すため、default__<名前> で定義する。
+#}
+
+{#- fct_purchase: 月ごとの明細件数・最大明細ID・小計合計（購入・購入明細だけを走査する） -#}
+{% macro default__fct_purchase_partition_fingerprint() %}
+    select
+        date_trunc('month', p.purchased_at)::date as partition_start,
+        count(*)::text
+            || ':' || coalesce(max(pd.id), 0)::text
+            || ':' || coalesce(sum(pd.subtotal), 0)::text as fingerprint
+    from {{ ref('stg_purchase_detail') }} pd
+    join {{ ref('stg_purchase') }} p on pd.purchase_id = p.id
+    where p.purchased_at is not null
+    group by 1
+{% endmacro %}
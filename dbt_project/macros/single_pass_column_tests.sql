@@ -0,0 +1,64 @@
+{#
+    カラムごとの unique / not_null をまとめて検査する generic test。
+
+    組み込みの unique / not_null はテストごとに 1 本のクエリになるため、
+    大きなファクトテーブルでは同じテーブルをテストの数だけ走査する。
+    このテストはすべての検査を 1 本の集計クエリ（1 回の走査）で行い、
+    違反のあった検査だけを 1 行ずつ返す。
+
+    - not_null: NULL の行数
+    - unique  : NULL を除いた行数 - ユニーク数（重複して余分な行数）
+
+    結果の読み方:
+    - dbt test の結果の件数（"Got N results"）は違反のあった検査の数
+    - 各行の check_name は組み込みテストと同じ名前（例: not_null_fct_purchase_member_id）、
+      failures はその検査の違反行数
+    - store_failures を有効にしているため、行は public_dbt_test__audit スキーマの
+      テストと同名のテーブルに保存される（dbt test の出力に select 文が表示される）
+
+    使い方（モデルの tests に指定する）:
+        tests:
+          - single_pass_column_tests:
+              unique: [id]
+              not_null: [id, member_id]
+#}
+{% test single_pass_column_tests(model, unique=[], not_null=[]) %}
+    {{ config(fail_calc='count(*)', store_failures=true) }}
+
+    {%- set checks = [] -%}
+    {%- for column in not_null -%}
+        {%- do checks.append(('not_null', column)) -%}
+    {%- endfor -%}
+    {%- for column in unique -%}
+        {%- do checks.append(('unique', column)) -%}
+    {%- endfor -%}
+    {%- if checks | length == 0 -%}
+        {{ exceptions.raise_compiler_error("single_pass_column_tests: unique または not_null にカラムを指定してください") }}
+    {%- endif %}
+
+with stats as (
+    select
+    {%- for test_name, column in checks %}
+        {% if test_name == 'not_null' -%}
+            count(*) - count({{ column }})
+        {%- else -%}
+            count({{ column }}) - count(distinct {{ column }})
+        {%- endif %} as check_{{ loop.index }}{{ ',' if not loop.last }}
+    {%- endfor %}
+    from {{ model }}
+)
+
+select
+    c.test_name || '_' || '{{ model.identifier }}' || '_' || c.column_name as check_name,
+    c.test_name,
+    c.column_name,
+    c.failures
+from stats
+cross join lateral (
+    values
+    {%- for test_name, column in checks %}
+        ('{{ test_name }}', '{{ column }}', stats.check_{{ loop.index }}){{ ',' if not loop.last }}
+    {%- endfor %}
+) as c (test_name, column_name, failures)
+where c.failures > 0
+{% endtest %}
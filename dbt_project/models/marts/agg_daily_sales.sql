@@ -0,0 +1,118 @@
+{{
+    config(
+        indexes=[
+            {'columns': ['sales_date']},
+        ],
+        cluster_by='sales_date'
+    )
+}}
+
+with purchase_line as (
+    select
+        f.purchased_at::date as sales_date,
+        d.category_id,
+        d.category_name,
+        f.status_at_purchase as member_status,
+        m.gender as member_gender,
+        f.purchase_id,
+        f.member_id,
+        f.quantity,
+        f.subtotal
+    from {{ ref('fct_purchase') }} f
+    left join {{ ref('dim_member') }} m on f.member_id = m.id
+    left join {{ ref('dim_food') }} d on f.food_id = d.id
+),
+
+sales as (
+    select
+        sales_date,
+        category_id,
+        category_name,
+        member_status,
+        member_gender,
+        -- 購入件数はカテゴリごとに数える（カテゴリをまたぐ購入は重複する。購入回数は purchase_sketch で求める）
+        count(distinct purchase_id) as num_category_purchases,
+        count(*) as num_line_items,
+        sum(quantity) as total_quantity,
+        sum(subtotal) as total_revenue
+    from purchase_line
+    group by
+        sales_date,
+        category_id,
+        category_name,
+        member_status,
+        member_gender
+),
+
+register as (
+    -- 購入者・購入ごとの HLL レジスタを求め、(グループ, レジスタ) ごとの最大値に集約する（macros/hll.sql）
+    select
+        sales_date,
+        category_id,
+        member_status,
+        member_gender,
+        'purchaser' as sketch,
+        {{ hll_register('member_id') }} as register,
+        max({{ hll_rho('member_id') }}) as rho
+    from purchase_line
+    group by
+        sales_date,
+        category_id,
+        member_status,
+        member_gender,
+        register
+
+    union all
+
+    select
+        sales_date,
+        category_id,
+        member_status,
+        member_gender,
+        'purchase' as sketch,
+        {{ hll_register('purchase_id') }} as register,
+        max({{ hll_rho('purchase_id') }}) as rho
+    from purchase_line
+    group by
+        sales_date,
+        category_id,
+        member_status,
+        member_gender,
+        register
+),
+
+sketch as (
+    select
+        sales_date,
+        category_id,
+        member_status,
+        member_gender,
+        hll_register_agg(register, rho) filter (where sketch = 'purchaser') as purchaser_sketch,
+        hll_register_agg(register, rho) filter (where sketch = 'purchase') as purchase_sketch
+    from register
+    group by
+        sales_date,
+        category_id,
+        member_status,
+        member_gender
+)
+
+select
+    s.sales_date,
+    s.category_id,
+    s.category_name,
+    s.member_status,
+    s.member_gender,
+    s.num_category_purchases,
+    s.num_line_items,
+    s.total_quantity,
+    s.total_revenue,
+    k.purchaser_sketch,
+    k.purchase_sketch
+from sales s
+-- 結合先が無い明細はカテゴリ・性別が NULL になるため、NULL 同士も一致させる
+left join sketch k
+    on k.sales_date = s.sales_date
+   and k.category_id is not distinct from s.category_id
+   and k.member_status is not distinct from s.member_status
+   and k.member_gender is not distinct from s.member_gender
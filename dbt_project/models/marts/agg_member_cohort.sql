@@ -0,0 +1,158 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='activity_month',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['activity_month', 'signup_month'], 'unique': True},
+        ]
+    )
+}}
+
+with watermark as (
+    -- 今回のビルドで取り込んだ範囲。次回の実行はこれより後ろの行が触れた活動月だけを作り直す
+    select
+        (select coalesce(max(id), 0) from {{ ref('dim_member') }}) as max_member_id,
+        (select coalesce(max(id), 0) from {{ ref('fct_purchase_header') }}) as max_purchase_id,
+        (select coalesce(max(id), 0) from {{ ref('stg_member_login') }}) as max_login_id,
+        (select coalesce(max(status_log_id), 0) from {{ ref('dim_member_status_history') }}) as max_status_log_id
+),
+
+recompute_from as (
+    {% if is_incremental() %}
+    -- 新しい購入・ログインはその月、新しいステータス変更・新規会員はその月以降のすべての月に影響する
+    select least(
+        (
+            select min(date_trunc('month', created_at))
+            from {{ ref('dim_member') }}
+            where id > (select max(max_member_id) from {{ this }})
+        ),
+        (
+            select min(date_trunc('month', purchased_at))
+            from {{ ref('fct_purchase_header') }}
+            where id > (select max(max_purchase_id) from {{ this }})
+        ),
+        (
+            select min(date_trunc('month', login_at))
+            from {{ ref('stg_member_login') }}
+            where id > (select max(max_login_id) from {{ this }})
+        ),
+        (
+            select min(date_trunc('month', valid_from))
+            from {{ ref('dim_member_status_history') }}
+            where status_log_id > (select max(max_status_log_id) from {{ this }})
+        )
+    )::date as activity_month
+    {% else %}
+    select min(date_trunc('month', created_at))::date as activity_month
+    from {{ ref('dim_member') }}
+    {% endif %}
+),
+
+cohort as (
+    select
+        id as member_id,
+        date_trunc('month', created_at)::date as signup_month
+    from {{ ref('dim_member') }}
+),
+
+cohort_size as (
+    select
+        signup_month,
+        count(*) as cohort_size
+    from cohort
+    group by signup_month
+),
+
+purchase_activity as (
+    select distinct
+        member_id,
+        date_trunc('month', purchased_at)::date as activity_month
+    from {{ ref('fct_purchase_header') }}
+    where purchased_at >= (select activity_month from recompute_from)
+),
+
+login_activity as (
+    select distinct
+        member_id,
+        date_trunc('month', login_at)::date as activity_month
+    from {{ ref('stg_member_login') }}
+    where login_at >= (select activity_month from recompute_from)
+),
+
+target_month as (
+    -- 作り直す活動月（活動が無い月も 0 件の行として持たせる）
+    select generate_series(
+        r.activity_month,
+        greatest(
+            (select max(activity_month) from purchase_activity),
+            (select max(activity_month) from login_activity)
+            {% if is_incremental() %}
+            , (select max(activity_month) from {{ this }})
+            {% endif %}
+        ),
+        interval '1 month'
+    )::date as activity_month
+    from recompute_from r
+),
+
+active as (
+    select
+        c.signup_month,
+        a.activity_month,
+        count(*) as active_members
+    from login_activity a
+    join cohort c on c.member_id = a.member_id
+    group by c.signup_month, a.activity_month
+),
+
+purchasing as (
+    select
+        c.signup_month,
+        a.activity_month,
+        count(*) as purchasing_members
+    from purchase_activity a
+    join cohort c on c.member_id = a.member_id
+    group by c.signup_month, a.activity_month
+),
+
+paid as (
+    -- 活動月の中で一日でも有料会員だった会員
+    select
+        c.signup_month,
+        m.activity_month,
+        count(distinct h.member_id) as paid_members
+    from {{ ref('dim_member_status_history') }} h
+    join target_month m
+        on h.valid_from < m.activity_month + interval '1 month'
+       and (h.valid_to is null or h.valid_to > m.activity_month)
+    join cohort c on c.member_id = h.member_id
+    where h.status = 1
+    group by c.signup_month, m.activity_month
+)
+
+select
+    s.signup_month,
+    m.activity_month,
+    (
+        (date_part('year', m.activity_month) - date_part('year', s.signup_month)) * 12
+        + date_part('month', m.activity_month) - date_part('month', s.signup_month)
+    )::smallint as months_since_signup,
+    s.cohort_size,
+    coalesce(a.active_members, 0) as active_members,
+    coalesce(p.purchasing_members, 0) as purchasing_members,
+    coalesce(pd.paid_members, 0) as paid_members,
+    w.max_member_id,
+    w.max_purchase_id,
+    w.max_login_id,
+    w.max_status_log_id
+from cohort_size s
+join target_month m on m.activity_month >= s.signup_month
+cross join watermark w
+left join active a
+    on a.signup_month = s.signup_month and a.activity_month = m.activity_month
+left join purchasing p
+    on p.signup_month = s.signup_month and p.activity_month = m.activity_month
+left join paid pd
+    on pd.signup_month = s.signup_month and pd.activity_month = m.activity_month
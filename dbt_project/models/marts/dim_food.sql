@@ -1,3 +1,12 @@
+{{
+    config(
+        indexes=[
+            {'columns': ['id'], 'unique': True},
+            {'columns': ['category_id']},
+        ]
+    )
+}}
+
 select
     f.id,
     f.name,
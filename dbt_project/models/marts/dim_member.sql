@@ -1,14 +1,42 @@
+{{
+    config(
+        indexes=[
+            {'columns': ['id'], 'unique': True},
+        ]
+    )
+}}
+
+-- 年齢・在籍日数・最終ログインからの日数はビルド日（current_date）時点の値。
+-- Lightdash のクエリ時に会員ごとに計算しないよう、ラベル化した属性と合わせてカラムとして持たせる。
+with member as (
+    select
+        *,
+        current_date - created_at::date as tenure_days,
+        current_date - last_login_at::date as days_since_last_login
+    from {{ ref('stg_member') }}
+)
+
 select
     id,
     last_name,
     first_name,
     birth_date,
+    {{ age_years('birth_date', 'current_date') }} as age,
+    {{ age_band('birth_date', 'current_date') }} as age_band,
     gender,
+    {{ gender_name('gender') }} as gender_name,
     address,
     status,
+    {{ status_name('status') }} as status_name,
     paid_at,
     quit_at,
     last_login_at,
+    tenure_days,
+    days_since_last_login,
+    -- 退会していない会員のうち、一定日数ログインしていない会員（ログインしたことが無い会員は登録日から数える）
+    status <> 9
+        and coalesce(days_since_last_login, tenure_days) >= {{ var('sleeping_days', 30) }}
+        as is_sleeping,
     created_at,
     updated_at
-from {{ ref('stg_member') }}
+from member
@@ -0,0 +1,83 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='member_id',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['member_id', 'valid_from']},
+        ]
+    )
+}}
+
+with target_member as (
+    select id as member_id
+    from {{ ref('stg_member') }}
+    {% if is_incremental() %}
+    -- 新しく登録された会員と、新しいステータス変更履歴がある会員だけ作り直す
+    where id > (select coalesce(max(member_id), 0) from {{ this }})
+       or id in (
+           select member_id
+           from {{ ref('stg_member_status_log') }}
+           where id > (select coalesce(max(status_log_id), 0) from {{ this }})
+       )
+    {% endif %}
+),
+
+status_log as (
+    select l.*
+    from {{ ref('stg_member_status_log') }} l
+    join target_member t on t.member_id = l.member_id
+),
+
+first_status_log as (
+    select distinct on (member_id)
+        member_id,
+        status_before
+    from status_log
+    order by member_id, changed_at, id
+),
+
+status_change as (
+    -- 登録時点のステータス（最初の変更履歴の変更前ステータス。履歴が無ければ現在のステータス）
+    select
+        m.id as member_id,
+        coalesce(f.status_before, m.status) as status,
+        m.created_at::date as valid_from,
+        null::integer as status_log_id
+    from {{ ref('stg_member') }} m
+    join target_member t on t.member_id = m.id
+    left join first_status_log f on f.member_id = m.id
+
+    union all
+
+    select
+        member_id,
+        status_after as status,
+        changed_at as valid_from,
+        id as status_log_id
+    from status_log
+),
+
+status_range as (
+    select
+        member_id,
+        status,
+        valid_from,
+        lead(valid_from) over (
+            partition by member_id
+            order by valid_from, coalesce(status_log_id, 0)
+        ) as valid_to,
+        status_log_id
+    from status_change
+)
+
+select
+    member_id,
+    status,
+    valid_from,
+    valid_to,
+    daterange(valid_from, valid_to, '[)') as valid_range,
+    valid_to is null as is_current,
+    status_log_id
+from status_range
@@ -1,3 +1,18 @@
+{{
+    config(
+        materialized='partitioned_table',
+        partition_by={'field': 'purchased_at'},
+        partition_fingerprint_macro='fct_purchase_partition_fingerprint',
+        indexes=[
+            {'columns': ['id']},
+            {'columns': ['purchase_id']},
+            {'columns': ['member_id']},
+            {'columns': ['food_id']},
+            {'columns': ['purchased_at'], 'type': 'brin'},
+        ]
+    )
+}}
+
 select
     pd.id,
     pd.purchase_id,
@@ -7,6 +22,12 @@ select
     p.shipping_address,
     pd.unit_price,
     pd.quantity,
-    pd.subtotal
+    pd.subtotal,
+    sh.status as status_at_purchase
 from {{ ref('stg_purchase_detail') }} pd
 left join {{ ref('stg_purchase') }} p on pd.purchase_id = p.id
+-- 購入日時点の会員ステータス（(member_id, valid_from) のインデックスで引く）
+left join {{ ref('dim_member_status_history') }} sh
+    on sh.member_id = p.member_id
+   and sh.valid_from <= p.purchased_at::date
+   and (sh.valid_to is null or p.purchased_at::date < sh.valid_to)
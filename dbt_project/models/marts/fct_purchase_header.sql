@@ -0,0 +1,38 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='append',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['id'], 'unique': True},
+            {'columns': ['member_id']},
+            {'columns': ['purchased_at'], 'type': 'brin'},
+        ]
+    )
+}}
+
+with purchase_detail as (
+    select
+        purchase_id,
+        count(*) as num_line_items,
+        sum(quantity) as total_quantity
+    from {{ ref('stg_purchase_detail') }}
+    {% if is_incremental() %}
+    where purchase_id > (select coalesce(max(id), 0) from {{ this }})
+    {% endif %}
+    group by purchase_id
+)
+
+select
+    p.id,
+    p.member_id,
+    p.purchased_at,
+    p.total_amount,
+    coalesce(pd.num_line_items, 0) as num_line_items,
+    coalesce(pd.total_quantity, 0) as total_quantity
+from {{ ref('stg_purchase') }} p
+left join purchase_detail pd on pd.purchase_id = p.id
+{% if is_incremental() %}
+-- 購入IDは追記のみで採番されるため、前回までに取り込んだ最大IDより後ろだけを処理する
+where p.id > (select coalesce(max(id), 0) from {{ this }})
+{% endif %}
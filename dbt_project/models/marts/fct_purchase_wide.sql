@@ -0,0 +1,39 @@
+{{
+    config(
+        enabled=var('enable_wide_fact', true),
+        materialized='incremental',
+        incremental_strategy='append',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['id'], 'unique': True},
+            {'columns': ['purchased_at'], 'type': 'brin'},
+        ]
+    )
+}}
+
+-- Lightdash のクエリ時に dim_member / dim_food と結合しないよう、よく使う属性をビルド時に結合しておく。
+-- 会員属性は購入時点の値（購入時点ステータス・購入時点年齢）なので、追記後に変わることはない。
+select
+    f.id,
+    f.purchase_id,
+    f.member_id,
+    f.food_id,
+    f.purchased_at,
+    f.unit_price,
+    f.quantity,
+    f.subtotal,
+    m.gender as member_gender,
+    {{ gender_name('m.gender') }} as member_gender_name,
+    {{ age_years('m.birth_date', 'f.purchased_at::date') }} as member_age_at_purchase,
+    {{ age_band('m.birth_date', 'f.purchased_at::date') }} as member_age_band,
+    f.status_at_purchase as member_status,
+    {{ status_name('f.status_at_purchase') }} as member_status_name,
+    d.category_id,
+    d.category_name,
+    d.price as food_price
+from {{ ref('fct_purchase') }} f
+left join {{ ref('dim_member') }} m on f.member_id = m.id
+left join {{ ref('dim_food') }} d on f.food_id = d.id
+{% if is_incremental() %}
+where f.id > (select coalesce(max(id), 0) from {{ this }})
+{% endif %}
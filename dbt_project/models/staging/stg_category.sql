@@ -1 +1,4 @@
-select * from {{ source('public_raw', 'category') }}
+select
+    id,
+    name
+from {{ source('public_raw', 'category') }}
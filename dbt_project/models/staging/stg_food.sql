@@ -1 +1,8 @@
-select * from {{ source('public_raw', 'food') }}
+select
+    id,
+    name,
+    category_id,
+    price,
+    created_at::timestamp(0) as created_at,
+    updated_at::timestamp(0) as updated_at
+from {{ source('public_raw', 'food') }}
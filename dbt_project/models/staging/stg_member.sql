@@ -1 +1,14 @@
-select * from {{ source('public_raw', 'member') }}
+select
+    id,
+    last_name,
+    first_name,
+    birth_date,
+    gender::smallint as gender,
+    address,
+    status::smallint as status,
+    paid_at::date as paid_at,
+    quit_at::date as quit_at,
+    last_login_at::timestamp(0) as last_login_at,
+    created_at::timestamp(0) as created_at,
+    updated_at::timestamp(0) as updated_at
+from {{ source('public_raw', 'member') }}
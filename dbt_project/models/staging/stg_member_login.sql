@@ -0,0 +1,5 @@
+select
+    id,
+    member_id,
+    login_at::timestamp(0) as login_at
+from {{ source('public_raw', 'member_login') }}
@@ -1 +1,7 @@
-select * from {{ source('public_raw', 'member_status_log') }}
+select
+    id,
+    member_id,
+    status_before::smallint as status_before,
+    status_after::smallint as status_after,
+    changed_at::date as changed_at
+from {{ source('public_raw', 'member_status_log') }}
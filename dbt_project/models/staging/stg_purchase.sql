@@ -1 +1,7 @@
-select * from {{ source('public_raw', 'purchase') }}
+select
+    id,
+    member_id,
+    shipping_address,
+    purchased_at::timestamp(0) as purchased_at,
+    total_amount
+from {{ source('public_raw', 'purchase') }}
@@ -1 +1,8 @@
-select * from {{ source('public_raw', 'purchase_detail') }}
+select
+    id,
+    purchase_id,
+    food_id,
+    unit_price,
+    quantity,
+    subtotal
+from {{ source('public_raw', 'purchase_detail') }}
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""dbt 実行プロファイラー
+
+dbt run の実行結果（target/run_results.json）とプロジェクト定義（target/manifest.json）を読み込み、
+DWH から取得したテーブルの件数・サイズと合わせて履歴ファイルに追記し、
+モデルごとの所要時間ランキングを前回実行との差分付きで表示します。
+
+実行前提:
+  - dbt run を実行済みであること（target/ に run_results.json と manifest.json があること）
+  - docker-compose.yml の dwh-db コンテナが起動していること（--no-db の場合は不要）
+  - プロジェクトルートに .env.local ファイルが存在すること
+
+処理内容:
+  1. run_results.json と manifest.json からモデルごとの所要時間・マテリアライズ・テーブル名を取得する
+  2. DWH の統計情報からテーブルの件数（推定値）とサイズを取得する
+     パーティションテーブルは全パーティションの合計を使う
+  3. 結果を history.jsonl に追記する（同じ invocation_id の実行は二重に追記しない）
+  4. 所要時間の長い順に、前回実行との差分を付けて表示する
+
+使い方:
+  uv run python dbt_project/run_profiler/report.py
+  uv run python dbt_project/run_profiler/report.py --top 10 --exact-counts
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+DBT_PROJECT_DIR = Path(__file__).parent.parent
+
+# プロジェクトルートの .env.local を読み込む
+load_dotenv(dotenv_path=DBT_PROJECT_DIR.parent / ".env.local")
+
+CONN_PARAMS = {
+    "host": os.getenv("DWH_PGHOST", "localhost"),
+    "port": int(os.getenv("DWH_PGPORT", "5434")),
+    "user": os.getenv("DWH_PGUSER"),
+    "password": os.getenv("DWH_PGPASSWORD"),
+    "dbname": os.getenv("DWH_PGDATABASE"),
+}
+
+DEFAULT_TARGET_DIR = DBT_PROJECT_DIR / "target"
+DEFAULT_HISTORY = Path(__file__).parent / "history.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# dbt アーティファクト読み込み
+# ---------------------------------------------------------------------------
+
+def load_run(target_dir: Path) -> list[dict]:
+    """run_results.json と manifest.json を結合し、モデルごとの実行結果を返す"""
+    with (target_dir / "run_results.json").open(encoding="utf-8") as f:
+        run_results = json.load(f)
+    with (target_dir / "manifest.json").open(encoding="utf-8") as f:
+        nodes = json.load(f)["nodes"]
+
+    metadata = run_results["metadata"]
+    records = []
+    for result in run_results["results"]:
+        node = nodes.get(result["unique_id"])
+        if node is None or node["resource_type"] != "model":
+            continue
+        records.append({
+            "invocation_id": metadata["invocation_id"],
+            "generated_at": metadata["generated_at"],
+            "unique_id": result["unique_id"],
+            "name": node["name"],
+            "materialized": node["config"]["materialized"],
+            "schema": node["schema"],
+            "relation": node.get("alias") or node["name"],
+            "status": result["status"],
+            "execution_time": result["execution_time"],
+            "rows_affected": (result.get("adapter_response") or {}).get("rows_affected"),
+        })
+    return records
+
+
+# ---------------------------------------------------------------------------
+# DWH の統計情報
+# ---------------------------------------------------------------------------
+
+def fetch_table_stats(
+    cur: psycopg2.extensions.cursor, schema: str, relation: str, exact_counts: bool
+) -> tuple[int | None, int | None]:
+    """テーブルの件数とサイズ（バイト、インデックス込み）を返す。ビュー・ephemeral は (None, None)。"""
+    cur.execute(
+        """
+        SELECT c.oid, c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s
+        """,
+        (schema, relation),
+    )
+    row = cur.fetchone()
+    if row is None or row[1] not in ("r", "p"):
+        return None, None
+
+    # パーティションテーブルは配下のパーティションを合計する（通常のテーブルは自身だけが返る）
+    cur.execute(
+        """
+        SELECT
+            COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint,
+            COALESCE(SUM(pg_total_relation_size(t.relid)), 0)::bigint
+        FROM pg_partition_tree(%s::regclass) t
+        JOIN pg_class c ON c.oid = t.relid
+        WHERE t.isleaf
+        """,
+        (row[0],),
+    )
+    estimated_rows, size_bytes = cur.fetchone()
+
+    if exact_counts:
+        cur.execute(f'SELECT COUNT(*) FROM "{schema}"."{relation}"')
+        return cur.fetchone()[0], size_bytes
+    return estimated_rows, size_bytes
+
+
+# ---------------------------------------------------------------------------
+# 履歴
+# ---------------------------------------------------------------------------
+
+def load_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path: Path, records: list[dict]) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def previous_run(history: list[dict], invocation_id: str) -> dict[str, dict]:
+    """指定した実行より前の、直近の実行のモデルごとの記録を返す"""
+    invocations = []
+    for record in history:
+        if record["invocation_id"] not in invocations:
+            invocations.append(record["invocation_id"])
+    if invocation_id in invocations:
+        invocations = invocations[: invocations.index(invocation_id)]
+    if not invocations:
+        return {}
+    last = invocations[-1]
+    return {r["unique_id"]: r for r in history if r["invocation_id"] == last}
+
+
+# ---------------------------------------------------------------------------
+# レポート
+# ---------------------------------------------------------------------------
+
+def _format_delta(current: float | None, previous: float | None, fmt: str) -> str:
+    if current is None or previous is None:
+        return "-"
+    delta = current - previous
+    if previous:
+        return f"{delta:+{fmt}} ({delta / previous * 100:+.0f}%)"
+    return f"{delta:+{fmt}}"
+
+
+def _format_size(size_bytes: int | None) -> str:
+    if size_bytes is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size_bytes < 1024 or unit == "GB":
+            return f"{size_bytes:.0f}{unit}" if unit == "B" else f"{size_bytes:.1f}{unit}"
+        size_bytes /= 1024
+
+
+def print_report(records: list[dict], previous: dict[str, dict], top: int | None) -> None:
+    total = sum(r["execution_time"] for r in records) or 1.0
+    ranked = sorted(records, key=lambda r: r["execution_time"], reverse=True)
+    if top:
+        ranked = ranked[:top]
+
+    print(
+        f"{'#':>2} {'model':<28} {'materialized':<17} {'status':<7} "
+        f"{'sec':>8} {'share':>6} {'Δsec':>16} {'rows':>11} {'Δrows':>20} {'size':>9}"
+    )
+    for rank, r in enumerate(ranked, start=1):
+        prev = previous.get(r["unique_id"], {})
+        rows = "-" if r["rows"] is None else f"{r['rows']:,}"
+        print(
+            f"{rank:>2} {r['name']:<28} {r['materialized']:<17} {r['status']:<7} "
+            f"{r['execution_time']:>8.2f} {r['execution_time'] / total * 100:>5.1f}% "
+            f"{_format_delta(r['execution_time'], prev.get('execution_time'), '.2f'):>16} "
+            f"{rows:>11} {_format_delta(r['rows'], prev.get('rows'), ',.0f'):>20} "
+            f"{_format_size(r['size_bytes']):>9}"
+        )
+    print()
+    print(f"合計 {total:.2f} 秒（{len(records)} モデル）")
+
+
+# ---------------------------------------------------------------------------
+# メイン処理
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="dbt run のモデルごとの所要時間レポート")
+    parser.add_argument("--target-dir", type=Path, default=DEFAULT_TARGET_DIR, help="dbt の target ディレクトリ")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="履歴ファイル")
+    parser.add_argument("--top", type=int, help="上位 N モデルだけ表示する")
+    parser.add_argument("--exact-counts", action="store_true", help="件数を統計情報ではなく COUNT(*) で取得する")
+    parser.add_argument("--no-db", action="store_true", help="DWH に接続せず件数・サイズを取得しない")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    print("=== dbt 実行プロファイル ===")
+    try:
+        records = load_run(args.target_dir)
+    except FileNotFoundError as e:
+        print(f"\n[エラー] dbt のアーティファクトが見つかりません: {e.filename}", file=sys.stderr)
+        print("dbt run を実行済みか確認してください", file=sys.stderr)
+        sys.exit(1)
+    if not records:
+        print("run_results.json にモデルの実行結果がありません")
+        return
+
+    invocation_id = records[0]["invocation_id"]
+    print(f"実行ID : {invocation_id}")
+    print(f"実行日時: {records[0]['generated_at']}")
+    print()
+
+    for record in records:
+        record["rows"] = record["size_bytes"] = None
+    if not args.no_db:
+        conn = None
+        try:
+            conn = psycopg2.connect(**CONN_PARAMS)
+            cur = conn.cursor()
+            for record in records:
+                record["rows"], record["size_bytes"] = fetch_table_stats(
+                    cur, record["schema"], record["relation"], args.exact_counts
+                )
+        except psycopg2.OperationalError as e:
+            print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
+            print(
+                "dwh-db コンテナが起動しているか確認してください: docker compose up -d dwh-db",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        except psycopg2.Error as e:
+            print(f"\n[エラー] {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    history = load_history(args.history)
+    if any(r["invocation_id"] == invocation_id for r in history):
+        print("この実行はすでに履歴に記録済みです（追記しません）")
+    else:
+        append_history(args.history, records)
+
+    print_report(records, previous_run(history, invocation_id), args.top)
+
+
+if __name__ == "__main__":
+    main()
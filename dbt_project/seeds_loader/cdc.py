@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""ローダー 差分取り込みツール（CDC）
+
+demo-db に論理レプリケーションスロット（test_decoding）を作り、INSERT / UPDATE / DELETE / TRUNCATE を
+WAL から読み取って dwh-db の public_raw スキーマに反映します。
+load.py はテーブルを丸ごと洗い替えますが、このツールの処理量は変更件数に比例します。
+
+実行前提:
+  - demo-db が wal_level=logical で起動していること（docker-compose.yml で設定済み）
+  - init.py を実行済みであること（public_raw スキーマが作成済みであること）
+  - プロジェクトルートに .env.local ファイルが存在すること
+
+処理内容:
+  --init を指定した場合:
+    1. レプリケーションスロットを作り直す（既存のスロットは削除する）
+    2. load.py と同じ方法で全テーブルを転送する（スロット作成後の変更は 3. 以降で重ねて反映される）
+    3. チェックポイントをスロットの作成位置にする
+  通常の実行:
+    1. スロットから変更をトランザクション単位で読み取る（pg_logical_slot_peek_changes）
+    2. テーブル・ID ごとに最後の変更にまとめ、削除 → 挿入で public_raw に反映し、
+       同じトランザクションでチェックポイント（public_raw._cdc_checkpoint）を更新する
+    3. スロットを反映済みの位置まで進める（pg_replication_slot_advance）
+    変更が無くなるまで 1〜3 を繰り返す。--follow を指定した場合は待機して読み取りを続ける。
+
+  2. と 3. の間で中断した場合も、チェックポイント以前のトランザクションは読み飛ばすため二重に反映しない。
+  スロットは読み取るまで WAL を保持し続けるため、使わなくなったら --drop で削除すること。
+
+使い方:
+  uv run python dbt_project/seeds_loader/cdc.py --init
+  uv run python dbt_project/seeds_loader/cdc.py
+  uv run python dbt_project/seeds_loader/cdc.py --follow --interval 5
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+
+
+def _load_sibling(name: str) -> ModuleType:
+    """同じディレクトリのスクリプトをパスで読み込む（実行ディレクトリ・読み込み元によらず同じ方法で参照するため）"""
+    spec = importlib.util.spec_from_file_location(f"loader_{name}", Path(__file__).parent / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+load = _load_sibling("load")
+
+SLOT_NAME = "dwh_cdc"
+PLUGIN = "test_decoding"
+CHECKPOINT_TABLE = f"{load.DEST_SCHEMA}._cdc_checkpoint"
+
+# 主キー（全テーブル共通）
+KEY_COLUMN = "id"
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_INTERVAL = 5.0
+
+# test_decoding の出力形式
+#   table public.member: INSERT: id[integer]:1 last_name[character varying]:'山田' paid_at[timestamp without time zone]:null
+#   table public.member: UPDATE: old-key: id[integer]:1 new-tuple: id[integer]:2 ...（主キーが変わった場合のみ old-key が付く）
+#   table public.member: DELETE: id[integer]:1
+#   table public.purchase_detail, public.purchase: TRUNCATE: (no-flags)
+_CHANGE = re.compile(r"^table (?P<tables>.+?): (?P<op>INSERT|UPDATE|DELETE|TRUNCATE):(?P<data>.*)$", re.S)
+_COLUMN = re.compile(r"(?P<name>[^\s\[]+)\[(?P<type>[^\]]+)\]:(?P<value>'(?:[^']|'')*'|\S+)")
+
+
+# ---------------------------------------------------------------------------
+# test_decoding 出力の解析
+# ---------------------------------------------------------------------------
+
+def _table_name(qualified: str) -> str | None:
+    """public スキーマのテーブル名を返す（それ以外のスキーマは None）"""
+    schema, _, table = qualified.strip().partition(".")
+    return table.strip('"') if schema.strip('"') == "public" else None
+
+
+def parse_columns(data: str) -> dict[str, str | None]:
+    """カラム名 → 値（テキスト表現。NULL は None）"""
+    columns = {}
+    for match in _COLUMN.finditer(data):
+        value = match["value"]
+        if value == "unchanged-toast-datum":
+            raise ValueError(
+                f"TOAST された値が変更データに含まれていません（{match['name']}）。"
+                "--init で全件転送し直してください"
+            )
+        if value == "null":
+            columns[match["name"]] = None
+        elif value.startswith("'"):
+            columns[match["name"]] = value[1:-1].replace("''", "'")
+        else:
+            columns[match["name"]] = value
+    return columns
+
+
+@dataclass
+class ChangeSet:
+    """複数トランザクション分の変更を、テーブル・主キーごとの最終状態にまとめたもの"""
+    # テーブル → 主キー → 行（削除の場合は None）
+    rows: dict[str, dict[str, dict | None]] = field(default_factory=dict)
+    truncated: set[str] = field(default_factory=set)
+    changes: int = 0
+
+    def apply_line(self, data: str) -> None:
+        match = _CHANGE.match(data)
+        if match is None:
+            return
+        op = match["op"]
+        tables = [_table_name(t) for t in match["tables"].split(",")]
+        tables = [t for t in tables if t in load.TABLES]
+        if not tables:
+            return
+        self.changes += 1
+
+        if op == "TRUNCATE":
+            # TRUNCATE より前の変更は不要になる
+            for table_name in tables:
+                self.rows.pop(table_name, None)
+                self.truncated.add(table_name)
+            return
+
+        table_rows = self.rows.setdefault(tables[0], {})
+        body = match["data"]
+        if op == "UPDATE" and "new-tuple:" in body:
+            old_key, _, body = body.partition("new-tuple:")
+            table_rows[parse_columns(old_key)[KEY_COLUMN]] = None
+        columns = parse_columns(body)
+        table_rows[columns[KEY_COLUMN]] = None if op == "DELETE" else columns
+
+
+# ---------------------------------------------------------------------------
+# レプリケーションスロット・チェックポイント
+# ---------------------------------------------------------------------------
+
+def drop_slot(src_cur: psycopg2.extensions.cursor) -> None:
+    src_cur.execute(
+        "SELECT pg_drop_replication_slot(slot_name) FROM pg_replication_slots WHERE slot_name = %s",
+        (SLOT_NAME,),
+    )
+
+
+def create_slot(src_cur: psycopg2.extensions.cursor) -> str:
+    """スロットを作り直し、作成位置（この位置より後の変更が読み取られる）を返す"""
+    drop_slot(src_cur)
+    src_cur.execute(
+        "SELECT lsn FROM pg_create_logical_replication_slot(%s, %s)", (SLOT_NAME, PLUGIN)
+    )
+    return src_cur.fetchone()[0]
+
+
+def create_checkpoint_table(dst_cur: psycopg2.extensions.cursor) -> None:
+    dst_cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            slot_name  TEXT PRIMARY KEY,
+            lsn        PG_LSN NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+        """
+    )
+
+
+def save_checkpoint(dst_cur: psycopg2.extensions.cursor, lsn: str) -> None:
+    dst_cur.execute(
+        f"""
+        INSERT INTO {CHECKPOINT_TABLE} (slot_name, lsn) VALUES (%s, %s)
+        ON CONFLICT (slot_name) DO UPDATE SET lsn = EXCLUDED.lsn, applied_at = NOW()
+        """,
+        (SLOT_NAME, lsn),
+    )
+
+
+def load_checkpoint(dst_cur: psycopg2.extensions.cursor) -> str:
+    try:
+        dst_cur.execute(f"SELECT lsn FROM {CHECKPOINT_TABLE} WHERE slot_name = %s", (SLOT_NAME,))
+    except psycopg2.errors.UndefinedTable:
+        raise ValueError("チェックポイントがありません。--init を実行してください") from None
+    row = dst_cur.fetchone()
+    if row is None:
+        raise ValueError("チェックポイントがありません。--init を実行してください")
+    return row[0]
+
+
+# ---------------------------------------------------------------------------
+# 変更の読み取り・反映
+# ---------------------------------------------------------------------------
+
+def read_changes(
+    src_cur: psycopg2.extensions.cursor, checkpoint: str, batch_size: int
+) -> tuple[ChangeSet, str | None]:
+    """スロットから変更を読み取り（スロットは進めない）、反映済みでないトランザクションをまとめる。
+
+    戻り値は (変更, 最後に読み取ったトランザクションのコミット位置)。変更が無い場合の位置は None。
+    """
+    src_cur.execute(
+        """
+        SELECT lsn, data, lsn <= %s::pg_lsn AS applied
+        FROM pg_logical_slot_peek_changes(%s, NULL, %s, 'include-xids', '0', 'skip-empty-xacts', '1')
+        """,
+        (checkpoint, SLOT_NAME, batch_size),
+    )
+    change_set = ChangeSet()
+    transaction: list[str] = []
+    last_lsn = None
+    for lsn, data, applied in src_cur.fetchall():
+        if data.startswith("BEGIN"):
+            transaction = []
+        elif data.startswith("COMMIT"):
+            # COMMIT 行の lsn はトランザクションの終了位置。チェックポイント以前のものは反映済み
+            if not applied:
+                for line in transaction:
+                    change_set.apply_line(line)
+            last_lsn = lsn
+        else:
+            transaction.append(data)
+    return change_set, last_lsn
+
+
+def destination_columns(dst_cur: psycopg2.extensions.cursor, table_name: str) -> dict[str, str]:
+    """public_raw のテーブルのカラム名 → 型"""
+    dst_cur.execute(
+        """
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum
+        """,
+        (f"{load.DEST_SCHEMA}.{table_name}",),
+    )
+    return dict(dst_cur.fetchall())
+
+
+def apply_changes(dst_cur: psycopg2.extensions.cursor, change_set: ChangeSet) -> dict[str, int]:
+    """まとめた変更を public_raw に反映し、テーブルごとの反映件数を返す。
+
+    変更データはソースの全カラムを持つが、書き込むのは public_raw のテーブルにあるカラムだけ。
+    値はテキスト表現のまま渡し、public_raw の型にキャストする（TYPE_OVERRIDES の変換も兼ねる）。
+    """
+    applied = {}
+    for table_name in load.TABLES:
+        rows = change_set.rows.get(table_name, {})
+        if table_name not in change_set.truncated and not rows:
+            continue
+        dest = f"{load.DEST_SCHEMA}.{table_name}"
+        columns = destination_columns(dst_cur, table_name)
+
+        if table_name in change_set.truncated:
+            dst_cur.execute(f"TRUNCATE TABLE {dest}")
+        if rows:
+            dst_cur.execute(
+                f"DELETE FROM {dest} WHERE {KEY_COLUMN} = ANY(%s::{columns[KEY_COLUMN]}[])",
+                (list(rows),),
+            )
+        upserts = [row for row in rows.values() if row is not None]
+        if upserts:
+            psycopg2.extras.execute_values(
+                dst_cur,
+                f"INSERT INTO {dest} ({', '.join(columns)}) VALUES %s",
+                [tuple(row.get(c) for c in columns) for row in upserts],
+                template="(" + ", ".join(f"%s::{t}" for t in columns.values()) + ")",
+            )
+        applied[table_name] = len(rows)
+    return applied
+
+
+def advance_slot(src_cur: psycopg2.extensions.cursor, lsn: str) -> None:
+    src_cur.execute("SELECT pg_replication_slot_advance(%s, %s::pg_lsn)", (SLOT_NAME, lsn))
+
+
+def sync(src_conn, dst_conn, batch_size: int) -> int:
+    """読み取れる変更がなくなるまで反映し、反映した変更の件数を返す"""
+    src_cur = src_conn.cursor()
+    dst_cur = dst_conn.cursor()
+    total = 0
+    while True:
+        checkpoint = load_checkpoint(dst_cur)
+        change_set, last_lsn = read_changes(src_cur, checkpoint, batch_size)
+        if last_lsn is None:
+            return total
+
+        applied = apply_changes(dst_cur, change_set)
+        save_checkpoint(dst_cur, last_lsn)
+        dst_conn.commit()
+        advance_slot(src_cur, last_lsn)
+
+        total += change_set.changes
+        if change_set.changes:
+            summary = ", ".join(f"{t} {n} 件" for t, n in applied.items())
+            truncated = f"（TRUNCATE: {', '.join(sorted(change_set.truncated))}）" if change_set.truncated else ""
+            print(f"  {last_lsn}: 変更 {change_set.changes} 件を反映しました: {summary}{truncated}")
+
+
+def initialize(src_conn, dst_conn) -> None:
+    src_cur = src_conn.cursor()
+    dst_cur = dst_conn.cursor()
+
+    print("[1/3] レプリケーションスロットを作成...")
+    start_lsn = create_slot(src_cur)
+    print(f"  スロット '{SLOT_NAME}' を作成しました（{start_lsn}）")
+
+    print("[2/3] 全テーブルを転送...")
+    # 変更データは全カラムを持つため、初回の転送もカラムを絞り込まない
+    load.load_tables(prune=False)
+
+    print("[3/3] チェックポイントを作成...")
+    create_checkpoint_table(dst_cur)
+    save_checkpoint(dst_cur, start_lsn)
+    dst_conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# メイン処理
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="demo-db の変更を WAL から public_raw に反映する")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--init", action="store_true", help="スロットを作り直して全件転送する")
+    mode.add_argument("--drop", action="store_true", help="スロットを削除する")
+    mode.add_argument("--follow", action="store_true", help="終了せずに変更を読み取り続ける")
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help="1 回に読み取る変更の件数の目安（トランザクションの途中では区切らない）",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL, help="--follow の読み取り間隔（秒）"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    print("=== 差分取り込み（CDC） ===")
+    print(
+        f"ソース          : {load.SRC_CONN_PARAMS['host']}:{load.SRC_CONN_PARAMS['port']}"
+        f" / {load.SRC_CONN_PARAMS['dbname']}（スロット: {SLOT_NAME}）"
+    )
+    print(
+        f"デスティネーション: {load.DST_CONN_PARAMS['host']}:{load.DST_CONN_PARAMS['port']}"
+        f" / {load.DST_CONN_PARAMS['dbname']}.{load.DEST_SCHEMA}"
+    )
+    print()
+
+    src_conn = dst_conn = None
+    try:
+        src_conn = psycopg2.connect(**load.SRC_CONN_PARAMS)
+        src_conn.autocommit = True
+        dst_conn = psycopg2.connect(**load.DST_CONN_PARAMS)
+
+        if args.drop:
+            drop_slot(src_conn.cursor())
+            print(f"  スロット '{SLOT_NAME}' を削除しました（存在した場合）")
+        elif args.init:
+            initialize(src_conn, dst_conn)
+        else:
+            while True:
+                total = sync(src_conn, dst_conn, args.batch_size)
+                if not args.follow:
+                    print(f"  合計 {total} 件の変更を反映しました")
+                    break
+                time.sleep(args.interval)
+
+    except KeyboardInterrupt:
+        print("\n中断しました（反映済みの変更はチェックポイントに記録されています）")
+    except psycopg2.OperationalError as e:
+        print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
+        print(
+            "demo-db および dwh-db コンテナが起動しているか確認してください:"
+            " docker compose up -d",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except (psycopg2.Error, RuntimeError, ValueError) as e:
+        print(f"\n[エラー] {e}", file=sys.stderr)
+        if dst_conn:
+            dst_conn.rollback()
+        sys.exit(1)
+    finally:
+        if src_conn:
+            src_conn.close()
+        if dst_conn:
+            dst_conn.close()
+
+    print()
+    print("=== 差分取り込み完了 ===")
+
+
+if __name__ == "__main__":
+    main()
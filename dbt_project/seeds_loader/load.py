@@ -9,15 +9,23 @@ seeds_loader/design.md の仕様に基づき、demo-db から dwh-db の public_
   - demo-db データベースにデータが投入済みであること
 
 処理内容:
-  demo-db の各テーブルの内容を public_raw スキーマにそのままコピーする。
+  demo-db の各テーブルの内容を public_raw スキーマにコピーする。
+  コード値・日付だけに意味がある日時は TYPE_OVERRIDES の型に変換してコピーする。
   テーブルが存在しない場合はソースのカラム定義をもとに作成する。
   既存データは実行のたびに洗い替えする。
+  dbt の manifest.json があれば、モデルから参照されているカラムだけをコピーし、
+  どのモデルからも参照されていないテーブルはスキップする。
 
 使い方:
   uv run python dbt_project/seeds_loader/load.py
+  uv run python dbt_project/seeds_loader/load.py member purchase   # テーブルを指定して転送
+  uv run python dbt_project/seeds_loader/load.py --all-columns     # manifest.json を使わず全カラムを転送
 """
 
+import argparse
+import json
 import os
+import re
 import sys
 from pathlib import Path
 
@@ -51,6 +59,7 @@ DEST_SCHEMA = "public_raw"
 # コピー対象テーブル（外部キー依存の順序で定義）
 TABLES = [
     "member",
+    "member_login",
     "member_status_log",
     "category",
     "food",
@@ -58,6 +67,140 @@ TABLES = [
     "purchase_detail",
 ]
 
+# ソースと異なる型で格納するカラム（テーブル → カラム → 型）。コピー時に SELECT でキャストする。
+#   - コード値（VARCHAR）は SMALLINT
+#   - 日付だけに意味がある日時（TIMESTAMP）は DATE
+TYPE_OVERRIDES: dict[str, dict[str, str]] = {
+    "member": {
+        "gender": "SMALLINT",
+        "status": "SMALLINT",
+        "paid_at": "DATE",
+        "quit_at": "DATE",
+    },
+    "member_status_log": {
+        "status_before": "SMALLINT",
+        "status_after": "SMALLINT",
+        "changed_at": "DATE",
+    },
+}
+
+
+# dbt の manifest.json（dbt run / compile / parse で target/ に出力される）
+DBT_PROJECT_DIR = Path(__file__).parent.parent
+MANIFEST_PATH = DBT_PROJECT_DIR / "target" / "manifest.json"
+# manifest.json の内容を決めるファイル（models / macros 配下の SQL・YAML に加えて確認する）
+MANIFEST_INPUTS = [
+    DBT_PROJECT_DIR / "dbt_project.yml",
+    DBT_PROJECT_DIR / "models" / "staging" / "_sources.yml",
+]
+
+# カラムを絞り込んでも常にコピーするカラム（cdc.py が差分反映のキーに使う）
+KEY_COLUMNS = ["id"]
+
+# select * / select t.* / , t.* （COUNT(*) は対象外）
+_SELECT_STAR = re.compile(r"(?:\bselect|,)\s*(?:distinct\s+)?(?:\"?\w+\"?\.)?\*", re.IGNORECASE)
+# source() / ref() / config() / var() 以外の Jinja（マクロでカラムが生成される可能性がある）
+_JINJA_CALL = re.compile(r"\{\{\s*(\w+)\s*\(")
+_SAFE_JINJA = {"source", "ref", "config", "var"}
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+# ---------------------------------------------------------------------------
+# 転送するカラムの決定（manifest.json）
+# ---------------------------------------------------------------------------
+
+def manifest_is_stale(manifest_path: Path = MANIFEST_PATH) -> bool:
+    """manifest.json が無い、または dbt_project.yml・ソース定義・モデル・マクロのファイルより古いかを返す"""
+    if not manifest_path.exists():
+        return True
+    mtime = manifest_path.stat().st_mtime
+    inputs = [
+        *MANIFEST_INPUTS,
+        *(
+            p
+            for d in ("models", "macros")
+            for p in (DBT_PROJECT_DIR / d).rglob("*")
+            if p.suffix in (".sql", ".yml")
+        ),
+    ]
+    return any(p.stat().st_mtime > mtime for p in inputs if p.exists())
+
+
+def _references_all_columns(code: str, is_compiled: bool) -> bool:
+    """SQL がソースの全カラムを参照しうるか（select *、または展開されていないマクロ呼び出し）"""
+    if _SELECT_STAR.search(code):
+        return True
+    if is_compiled:
+        return False
+    return "{%" in code or any(name not in _SAFE_JINJA for name in _JINJA_CALL.findall(code))
+
+
+def source_references(manifest_path: Path = MANIFEST_PATH) -> dict[str, set[str] | None] | None:
+    """manifest.json から、public_raw のテーブルごとに下流で参照されている識別子を求める。
+
+    テーブルを直接参照しているノード（staging モデル・ソースのテスト）の SQL を識別子に分解し、
+    ソースのカラム名と突き合わせるための集合を返す（実際のカラムより多めに含むのは構わない）。
+    コンパイル済みの SQL があればそれを、無ければ生の SQL を使う。
+
+    Returns:
+        テーブル名 → 参照されている識別子の集合。None は全カラムを転送する（select * など）。
+        どのノードからも参照されていないテーブルは含まない。
+        manifest.json が無い・dbt_project.yml やモデル・マクロより古い場合は None（全テーブル・全カラムを転送する）。
+    """
+    if manifest_is_stale(manifest_path):
+        return None
+    with manifest_path.open(encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    sources = {
+        unique_id: source
+        for unique_id, source in manifest["sources"].items()
+        if source["source_name"] == DEST_SCHEMA
+    }
+    references: dict[str, set[str] | None] = {}
+    for source in sources.values():
+        if source.get("loaded_at_field"):
+            references.setdefault(source["name"], set()).update(
+                _IDENTIFIER.findall(source["loaded_at_field"])
+            )
+
+    for node in manifest["nodes"].values():
+        tables = [
+            sources[unique_id]["name"]
+            for unique_id in node.get("depends_on", {}).get("nodes", [])
+            if unique_id in sources
+        ]
+        if not tables:
+            continue
+
+        if node.get("test_metadata"):
+            # generic test はカラム名と引数だけを見る（SQL はマクロ呼び出しのため）
+            identifiers = set(_IDENTIFIER.findall(node.get("column_name") or ""))
+            for value in node["test_metadata"].get("kwargs", {}).values():
+                if isinstance(value, str):
+                    identifiers.update(_IDENTIFIER.findall(value))
+        else:
+            code = node.get("compiled_code") or node.get("raw_code", "")
+            if _references_all_columns(code, is_compiled=bool(node.get("compiled_code"))):
+                identifiers = None
+            else:
+                identifiers = set(_IDENTIFIER.findall(code))
+
+        for table_name in tables:
+            if identifiers is None or references.get(table_name, set()) is None:
+                references[table_name] = None
+            else:
+                references.setdefault(table_name, set()).update(identifiers)
+    return references
+
+
+def prune_columns(col_info: list[tuple], identifiers: set[str] | None) -> list[tuple]:
+    """カラム情報のうち、参照されているカラムと KEY_COLUMNS だけを残す（None の場合は全カラム）"""
+    if identifiers is None:
+        return col_info
+    lowered = {i.lower() for i in identifiers}
+    return [row for row in col_info if row[0] in KEY_COLUMNS or row[0].lower() in lowered]
+
 
 # ---------------------------------------------------------------------------
 # テーブル定義取得・生成
@@ -117,10 +260,13 @@ def create_table_if_not_exists(
 ) -> None:
     """デスティネーションの public_raw スキーマにテーブルを作成する。
 
-    外部キー・NOT NULL などの制約は付与しない。
+    外部キー・NOT NULL などの制約は付与しない。TYPE_OVERRIDES にあるカラムはその型で作成する。
+    既に存在するテーブルは作り直さず、TYPE_OVERRIDES の型になっているかだけを確認する。
     """
+    overrides = TYPE_OVERRIDES.get(table_name, {})
     col_defs = [
-        f"    {col_name} {_map_pg_type(data_type, char_max_len, num_precision, num_scale)}"
+        f"    {col_name} "
+        + overrides.get(col_name, _map_pg_type(data_type, char_max_len, num_precision, num_scale))
         for col_name, data_type, char_max_len, num_precision, num_scale in col_info
     ]
     dst_cur.execute(
@@ -128,23 +274,62 @@ def create_table_if_not_exists(
         + ",\n".join(col_defs)
         + "\n)"
     )
+    check_type_overrides(dst_cur, table_name)
+
+
+def check_type_overrides(dst_cur: psycopg2.extensions.cursor, table_name: str) -> None:
+    """public_raw のテーブルのカラムが TYPE_OVERRIDES の型になっているかを確認する。
+
+    CREATE TABLE IF NOT EXISTS は既存のテーブルを作り直さないため、TYPE_OVERRIDES を追加・変更した後は
+    古い型のまま（VARCHAR・TIMESTAMP）残っている。そのままキャストした値を投入すると元の型に戻されるため、
+    初期化ツールの実行を促して中断する。
+    """
+    overrides = TYPE_OVERRIDES.get(table_name, {})
+    if not overrides:
+        return
+    dst_cur.execute(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s
+        """,
+        (DEST_SCHEMA, table_name),
+    )
+    actual = dict(dst_cur.fetchall())
+    # TYPE_OVERRIDES の型は information_schema の data_type を大文字にしたもので書く（SMALLINT / DATE）
+    mismatched = [
+        f"{column}（{actual[column]} → {expected.lower()}）"
+        for column, expected in overrides.items()
+        if column in actual and actual[column] != expected.lower()
+    ]
+    if mismatched:
+        raise RuntimeError(
+            f"{DEST_SCHEMA}.{table_name} のカラムの型が TYPE_OVERRIDES と異なります: {', '.join(mismatched)}\n"
+            "init.py を実行して public_raw スキーマを作り直してから投入してください"
+        )
 
 
 # ---------------------------------------------------------------------------
 # データコピー
 # ---------------------------------------------------------------------------
 
+def select_list(table_name: str, columns: list[str]) -> str:
+    """ソースから読み出す SELECT 句（TYPE_OVERRIDES のカラムはキャストする）"""
+    overrides = TYPE_OVERRIDES.get(table_name, {})
+    return ", ".join(f"{c}::{overrides[c]} AS {c}" if c in overrides else c for c in columns)
+
+
 def copy_table(
     src_cur: psycopg2.extensions.cursor,
     dst_cur: psycopg2.extensions.cursor,
     table_name: str,
     col_info: list[tuple],
 ) -> None:
-    """ソーステーブルの全データをデスティネーションにコピーする。"""
+    """ソーステーブルの全データをデスティネーションにコピーする（col_info にあるカラムだけ）。"""
     columns = [row[0] for row in col_info]
     cols_str = ", ".join(columns)
 
-    src_cur.execute(f"SELECT {cols_str} FROM {table_name}")
+    src_cur.execute(f"SELECT {select_list(table_name, columns)} FROM {table_name}")
     rows = src_cur.fetchall()
 
     dst_cur.execute(f"TRUNCATE TABLE {DEST_SCHEMA}.{table_name}")
@@ -162,17 +347,16 @@ def copy_table(
 # メイン処理
 # ---------------------------------------------------------------------------
 
-def main() -> None:
-    print("=== データ投入 ===")
-    print(
-        f"ソース          : {SRC_CONN_PARAMS['host']}:{SRC_CONN_PARAMS['port']}"
-        f" / {SRC_CONN_PARAMS['dbname']}"
-    )
-    print(
-        f"デスティネーション: {DST_CONN_PARAMS['host']}:{DST_CONN_PARAMS['port']}"
-        f" / {DST_CONN_PARAMS['dbname']}.{DEST_SCHEMA}"
-    )
-    print()
+def load_tables(table_names: list[str] = TABLES, prune: bool = True) -> None:
+    """指定したテーブルを転送する（pipeline から変更のあったテーブルだけ転送するときにも使う）
+
+    prune が True で manifest.json を使える場合は、モデルから参照されているカラムだけをコピーし、
+    参照されていないテーブルはスキップする。テーブルはカラムを絞り込まずに作成する
+    （コピーしないカラムは NULL になる）。
+    """
+    references = source_references() if prune else None
+    if prune and references is None:
+        print("  manifest.json が無い（または dbt_project.yml・モデルより古い）ため、全カラムを転送します")
 
     src_conn = dst_conn = None
     try:
@@ -181,13 +365,65 @@ def main() -> None:
         src_cur = src_conn.cursor()
         dst_cur = dst_conn.cursor()
 
-        for table_name in TABLES:
+        for table_name in table_names:
             print(f"'{table_name}' を処理中...")
+            if references is not None and table_name not in references:
+                print(f"  {table_name}: 参照しているモデルが無いためスキップしました")
+                continue
             col_info = get_column_info(src_cur, table_name)
             create_table_if_not_exists(dst_cur, table_name, col_info)
-            copy_table(src_cur, dst_cur, table_name, col_info)
+            copied = prune_columns(col_info, references[table_name]) if references else col_info
+            if len(copied) < len(col_info):
+                skipped = [row[0] for row in col_info if row not in copied]
+                print(f"  {table_name}: 参照されていないカラムを除外します: {', '.join(skipped)}")
+            copy_table(src_cur, dst_cur, table_name, copied)
             dst_conn.commit()
+    except psycopg2.Error:
+        if dst_conn:
+            dst_conn.rollback()
+        raise
+    finally:
+        if src_conn:
+            src_conn.close()
+        if dst_conn:
+            dst_conn.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="demo-db から dwh-db の public_raw にデータを転送する")
+    parser.add_argument(
+        "tables", nargs="*", metavar="table",
+        help=f"転送するテーブル（省略時は全テーブル）: {', '.join(TABLES)}",
+    )
+    parser.add_argument(
+        "--all-columns", action="store_true",
+        help="manifest.json を使わず、全テーブルの全カラムを転送する",
+    )
+    args = parser.parse_args()
+    unknown = [t for t in args.tables if t not in TABLES]
+    if unknown:
+        parser.error(f"転送対象ではないテーブルです: {', '.join(unknown)}")
+    # 指定順ではなく外部キー依存の順序で転送する
+    args.tables = [t for t in TABLES if t in args.tables] if args.tables else TABLES
+    return args
+
+
+def main() -> None:
+    args = parse_args()
 
+    print("=== データ投入 ===")
+    print(
+        f"ソース          : {SRC_CONN_PARAMS['host']}:{SRC_CONN_PARAMS['port']}"
+        f" / {SRC_CONN_PARAMS['dbname']}"
+    )
+    print(
+        f"デスティネーション: {DST_CONN_PARAMS['host']}:{DST_CONN_PARAMS['port']}"
+        f" / {DST_CONN_PARAMS['dbname']}.{DEST_SCHEMA}"
+    )
+    print()
+
+    try:
+        load_tables(args.tables, prune=not args.all_columns)
     except psycopg2.OperationalError as e:
         print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
         print(
@@ -196,16 +432,9 @@ def main() -> None:
             file=sys.stderr,
         )
         sys.exit(1)
-    except psycopg2.Error as e:
+    except (psycopg2.Error, RuntimeError) as e:
         print(f"\n[エラー] {e}", file=sys.stderr)
-        if dst_conn:
-            dst_conn.rollback()
         sys.exit(1)
-    finally:
-        if src_conn:
-            src_conn.close()
-        if dst_conn:
-            dst_conn.close()
 
     print()
     print("=== データ投入完了 ===")
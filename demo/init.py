@@ -41,13 +41,19 @@ CONN_PARAMS = {
 
 
 def drop_database_if_exists(conn: psycopg2.extensions.connection, db_name: str) -> None:
-    """データベースが存在する場合、既存接続を切断してから削除する"""
+    """データベースが存在する場合、既存接続とレプリケーションスロットを削除してから削除する"""
     cur = conn.cursor()
     cur.execute(
         "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
         "WHERE datname = %s AND pid <> pg_backend_pid()",
         [db_name],
     )
+    # 論理レプリケーションスロット（seeds_loader/cdc.py）があるとデータベースを削除できない
+    cur.execute(
+        "SELECT pg_drop_replication_slot(slot_name) FROM pg_replication_slots "
+        "WHERE database = %s",
+        [db_name],
+    )
     cur.execute(
         sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(db_name))
     )
@@ -190,6 +196,16 @@ def create_tables(db_name: str) -> None:
         """)
         print("  テーブル 'member_status_log' を作成しました")
 
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS member_login (
+                id         BIGSERIAL PRIMARY KEY,
+                member_id  INTEGER   NOT NULL REFERENCES member(id),
+                login_at   TIMESTAMP NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """)
+        print("  テーブル 'member_login' を作成しました")
+
         conn.commit()
     finally:
         conn.close()
@@ -220,13 +236,8 @@ def grant_schema_privileges(db_name: str, user: str) -> None:
     print(f"  ユーザー '{user}' に PUBLIC スキーマへの全権限を付与しました")
 
 
-def main() -> None:
-    print("=== デモデータベース初期化 ===")
-    print(f"接続先 : {CONN_PARAMS['host']}:{CONN_PARAMS['port']}")
-    print(f"DB 名  : {DEMO_DB}")
-    print(f"ユーザー: {DEMO_USER}")
-    print()
-
+def init_demo_database() -> None:
+    """データベース・ユーザー・テーブルを作り直す（失敗時は psycopg2.Error を送出する）"""
     conn = None
     try:
         conn = psycopg2.connect(**CONN_PARAMS)
@@ -250,7 +261,20 @@ def main() -> None:
 
         print("[5/5] テーブルを作成...")
         create_tables(DEMO_DB)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def main() -> None:
+    print("=== デモデータベース初期化 ===")
+    print(f"接続先 : {CONN_PARAMS['host']}:{CONN_PARAMS['port']}")
+    print(f"DB 名  : {DEMO_DB}")
+    print(f"ユーザー: {DEMO_USER}")
+    print()
 
+    try:
+        init_demo_database()
     except psycopg2.OperationalError as e:
         print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
         print("demo-db コンテナが起動しているか確認してください: docker compose up -d demo-db", file=sys.stderr)
@@ -258,9 +282,6 @@ def main() -> None:
     except psycopg2.Error as e:
         print(f"\n[エラー] {e}", file=sys.stderr)
         sys.exit(1)
-    finally:
-        if conn is not None:
-            conn.close()
 
     print()
     print("=== 初期化完了 ===")
@@ -8,8 +8,10 @@ design.md・models.md の仕様に従い、デモ用データを日付ごとに
 
 使い方:
   uv run python demo/seed.py
+  uv run python demo/seed.py --engine sql   # データ生成を Postgres 側で行う（高速）
 """
 
+import argparse
 import os
 import random
 import sys
@@ -136,6 +138,11 @@ def _round_price(price: int) -> int:
     return (price // 100) * 100
 
 
+def _provider_kwargs(random_seed: int | None) -> dict:
+    """mimesis プロバイダーに渡すシード引数を返す（未指定の場合は空）"""
+    return {} if random_seed is None else {"seed": random_seed}
+
+
 # ---------------------------------------------------------------------------
 # DB 操作
 # ---------------------------------------------------------------------------
@@ -179,6 +186,7 @@ def insert_foods(
     count: int,
     start_date: date,
     category_id_map: dict[str, int],
+    random_seed: int | None = None,
 ) -> None:
     """food テーブルにテストデータを投入する。
 
@@ -186,9 +194,10 @@ def insert_foods(
     category_id は category テーブルから逆引きして設定する。
     price は Finance プロバイダーで生成する。
     created_at / updated_at は開始日を設定する。
+    random_seed を指定した場合は mimesis のプロバイダーにも同じシードを与える。
     """
-    food = Food(locale=Locale.JA)
-    finance = Finance(locale=Locale.JA)
+    food = Food(locale=Locale.JA, **_provider_kwargs(random_seed))
+    finance = Finance(locale=Locale.JA, **_provider_kwargs(random_seed))
 
     # Foodメソッドと対応する日本語カテゴリ名のマッピング
     category_methods = [
@@ -309,7 +318,7 @@ def process_logins_and_purchases_for_day(
 
     通常会員: 20% がログイン → ログイン者の 30% が購入（¥2,000〜10,000）
     有料会員: 50% がログイン → ログイン者の 50% が購入（¥5,000〜20,000）
-    ログインした会員の last_login_at を更新する。
+    ログインは member_login に追記する（member.last_login_at は refresh_last_login_at でまとめて反映する）。
     """
     def random_time() -> datetime:
         return datetime.combine(
@@ -329,14 +338,8 @@ def process_logins_and_purchases_for_day(
         if logged_in:
             psycopg2.extras.execute_values(
                 cur,
-                """
-                UPDATE member
-                SET last_login_at = v.login_at, updated_at = v.login_at
-                FROM (VALUES %s) AS v(id, login_at)
-                WHERE member.id = v.id
-                """,
+                "INSERT INTO member_login (member_id, login_at) VALUES %s",
                 [(m[0], random_time()) for m in logged_in],
-                template="(%s, %s::timestamp)",
             )
 
         purchasers = [m for m in logged_in if random.random() < purchase_rate]
@@ -373,6 +376,30 @@ def process_logins_and_purchases_for_day(
     )
 
 
+def refresh_last_login_at(cur: psycopg2.extensions.cursor) -> int:
+    """member_login の最新ログイン日時を member.last_login_at に反映する。
+
+    日次で member を UPDATE すると不要タプルが大量に発生するため、
+    ログインは member_login に追記しておき、実行の最後に一度だけ反映する。
+    値が変わる会員だけを更新し、更新件数を返す。
+    """
+    cur.execute(
+        """
+        UPDATE member m
+        SET last_login_at = l.last_login_at,
+            updated_at = GREATEST(m.updated_at, l.last_login_at)
+        FROM (
+            SELECT member_id, MAX(login_at) AS last_login_at
+            FROM member_login
+            GROUP BY member_id
+        ) l
+        WHERE m.id = l.member_id
+          AND m.last_login_at IS DISTINCT FROM l.last_login_at
+        """
+    )
+    return cur.rowcount
+
+
 def get_member_count(cur: psycopg2.extensions.cursor) -> int:
     """現在の会員数を取得する"""
     cur.execute("SELECT COUNT(*) FROM member")
@@ -493,8 +520,19 @@ def update_member_statuses_for_day(
 # メイン処理
 # ---------------------------------------------------------------------------
 
-def seed(start_date: date) -> None:
+def seed(
+    start_date: date,
+    conn_params: dict = CONN_PARAMS,
+    random_seed: int | None = None,
+) -> None:
+    """開始日から今日までのデモデータを生成する。
+
+    conn_params で接続先を差し替えられる（ベンチマーク用の使い捨て DB など）。
+    random_seed を指定すると同じ開始日に対して同じデータ量・分布が再現される。
+    """
     today = date.today()
+    if random_seed is not None:
+        random.seed(random_seed)
 
     # 年間成長率を 30%〜70% の範囲でランダムに決定（元の 1.3〜1.7 倍）
     annual_multiplier = random.uniform(1.3, 1.7)
@@ -506,17 +544,17 @@ def seed(start_date: date) -> None:
     print(f"  日次成長率  : {daily_rate * 100:.4f}%")
     print()
 
-    person = Person(locale=Locale.JA)
-    address = Address(locale=Locale.JA)
+    person = Person(locale=Locale.JA, **_provider_kwargs(random_seed))
+    address = Address(locale=Locale.JA, **_provider_kwargs(random_seed))
 
-    conn = psycopg2.connect(**CONN_PARAMS)
+    conn = psycopg2.connect(**conn_params)
     try:
         cur = conn.cursor()
 
         # 全テーブルをTRUNCATE（外部キー依存順：参照元から削除）
         cur.execute(
             "TRUNCATE TABLE "
-            "purchase_detail, purchase, member_status_log, "
+            "purchase_detail, purchase, member_status_log, member_login, "
             "member_property, food, member, category"
         )
         conn.commit()
@@ -528,7 +566,7 @@ def seed(start_date: date) -> None:
 
         print("食品データを投入中...")
         category_id_map = get_category_id_map(cur)
-        insert_foods(cur, 1000, start_date, category_id_map)
+        insert_foods(cur, 1000, start_date, category_id_map, random_seed)
         conn.commit()
 
         foods = get_foods(cur)
@@ -580,11 +618,546 @@ def seed(start_date: date) -> None:
             current_date += timedelta(days=1)
 
         print()
+        updated = refresh_last_login_at(cur)
+        conn.commit()
+        print(f"  member.last_login_at: {updated} 件更新しました")
         print(f"  合計 {total_inserted} 件挿入しました")
     finally:
         conn.close()
 
 
+# ---------------------------------------------------------------------------
+# SQL エンジン（データ生成を Postgres 側で行う）
+# ---------------------------------------------------------------------------
+
+# 氏名・住所プールの件数（mimesis で生成し、一時テーブルに一度だけ投入する）
+POOL_SIZE = 1000
+
+
+def create_name_pools(
+    cur: psycopg2.extensions.cursor,
+    person: Person,
+    address: Address,
+) -> None:
+    """mimesis で生成した氏名・住所を一時テーブル seed_person / seed_address に投入する。
+
+    会員ごとの値はこのプールから SQL 側で random() により選ぶ。
+    姓と名は別々に選ぶため、組み合わせは POOL_SIZE の 2 乗通りになる。
+    """
+    cur.execute(
+        """
+        CREATE TEMP TABLE seed_person (
+            idx        INTEGER     PRIMARY KEY,
+            last_name  VARCHAR(50) NOT NULL,
+            first_name VARCHAR(50) NOT NULL
+        )
+        """
+    )
+    psycopg2.extras.execute_values(
+        cur,
+        "INSERT INTO seed_person (idx, last_name, first_name) VALUES %s",
+        [(i, person.last_name(), person.first_name()) for i in range(POOL_SIZE)],
+    )
+
+    cur.execute(
+        """
+        CREATE TEMP TABLE seed_address (
+            idx     INTEGER      PRIMARY KEY,
+            address VARCHAR(255) NOT NULL
+        )
+        """
+    )
+    psycopg2.extras.execute_values(
+        cur,
+        "INSERT INTO seed_address (idx, address) VALUES %s",
+        [
+            (i, address.state() + address.city() + address.address())
+            for i in range(POOL_SIZE)
+        ],
+    )
+
+
+def create_food_pool(cur: psycopg2.extensions.cursor) -> int:
+    """food テーブルから購入明細の抽選用の一時テーブル seed_food を作り、件数を返す。
+
+    価格が 0 円の食品は明細にならないため（build_purchase_details_for_range と同じ）、
+    あらかじめ除外しておく。
+    """
+    cur.execute(
+        """
+        CREATE TEMP TABLE seed_food AS
+        SELECT (row_number() OVER (ORDER BY id) - 1)::integer AS idx, id, name, price
+        FROM food
+        WHERE price > 0
+        """
+    )
+    cur.execute("ALTER TABLE seed_food ADD PRIMARY KEY (idx)")
+    cur.execute("SELECT COUNT(*) FROM seed_food")
+    return cur.fetchone()[0]
+
+
+def insert_members_sql(
+    cur: psycopg2.extensions.cursor,
+    count: int,
+    target_date: date,
+) -> None:
+    """指定日の会員と会員属性を INSERT ... SELECT で生成する。
+
+    分布は generate_birth_date / generate_gender / generate_member_property と同じ。
+    """
+    cur.execute(
+        """
+        WITH draw AS (
+            SELECT
+                floor(random() * %(pool_size)s)::integer AS last_name_idx,
+                floor(random() * %(pool_size)s)::integer AS first_name_idx,
+                floor(random() * %(pool_size)s)::integer AS address_idx,
+                random() AS r_age,
+                18 + floor(random() * 13)::integer AS young_age,
+                31 + floor(random() * 30)::integer AS middle_age,
+                61 + floor(random() * 10)::integer AS senior_age,
+                1 + floor(random() * 12)::integer AS birth_month,
+                1 + floor(random() * 28)::integer AS birth_day,
+                random() AS r_gender
+            FROM generate_series(1, %(count)s)
+        ),
+        new_member AS (
+            INSERT INTO member
+                (last_name, first_name, birth_date, gender, address, status,
+                 last_login_at, created_at, updated_at)
+            SELECT
+                ln.last_name,
+                fn.first_name,
+                -- 18〜30歳: 50%%、31〜60歳: 40%%、61〜70歳: 10%%
+                make_date(
+                    %(year)s - CASE
+                        WHEN d.r_age < 0.50 THEN d.young_age
+                        WHEN d.r_age < 0.90 THEN d.middle_age
+                        ELSE d.senior_age
+                    END,
+                    d.birth_month,
+                    d.birth_day
+                ),
+                CASE
+                    WHEN d.r_gender < 0.07 THEN %(male)s
+                    WHEN d.r_gender < 0.08 THEN %(other)s
+                    ELSE %(female)s
+                END,
+                a.address,
+                %(normal)s,
+                NULL,
+                %(target_date)s,
+                %(target_date)s
+            FROM draw d
+            JOIN seed_person ln ON ln.idx = d.last_name_idx
+            JOIN seed_person fn ON fn.idx = d.first_name_idx
+            JOIN seed_address a ON a.idx = d.address_idx
+            RETURNING id
+        ),
+        paid AS (
+            SELECT
+                id,
+                CASE WHEN random() < 0.10 THEN 30 + floor(random() * 151)::integer END AS to_paid_days,
+                random() AS r_sleep,
+                30 + floor(random() * 151)::integer AS sleep_days,
+                random() AS r_quit,
+                30 + floor(random() * 151)::integer AS quit_days
+            FROM new_member
+        ),
+        sleep AS (
+            SELECT
+                *,
+                CASE WHEN to_paid_days IS NULL AND r_sleep < 0.20 THEN sleep_days END AS to_sleep_days
+            FROM paid
+        )
+        INSERT INTO member_property (id, to_paid_days, to_sleep_days, to_quit_days)
+        SELECT
+            id,
+            to_paid_days,
+            to_sleep_days,
+            -- GREATEST は NULL を無視するため、to_paid_days が NULL ならそのまま quit_days になる
+            CASE
+                WHEN to_sleep_days IS NULL AND r_quit < 0.05 THEN GREATEST(quit_days, to_paid_days + 30)
+            END
+        FROM sleep
+        """,
+        {
+            "pool_size": POOL_SIZE,
+            "count": count,
+            "year": date.today().year,
+            "male": GENDER_MALE,
+            "female": GENDER_FEMALE,
+            "other": GENDER_OTHER,
+            "normal": STATUS_NORMAL,
+            "target_date": target_date,
+        },
+    )
+
+
+def update_member_statuses_sql(
+    cur: psycopg2.extensions.cursor,
+    target_date: date,
+) -> None:
+    """update_member_statuses_for_day と同じステータス変更を、会員 ID を取得せずに行う"""
+    params = {
+        "normal": STATUS_NORMAL,
+        "paid": STATUS_PAID,
+        "quit": STATUS_QUIT,
+        "target_date": target_date,
+    }
+
+    # 有料会員に昇格（無料会員 → 有料会員）
+    cur.execute(
+        """
+        WITH changed AS (
+            UPDATE member m
+            SET status = %(paid)s, paid_at = %(target_date)s, updated_at = %(target_date)s
+            FROM member_property mp
+            WHERE m.id = mp.id
+              AND mp.to_paid_days IS NOT NULL
+              AND m.status = %(normal)s
+              AND m.created_at::date + mp.to_paid_days = %(target_date)s
+            RETURNING m.id
+        )
+        INSERT INTO member_status_log (member_id, status_before, status_after, changed_at)
+        SELECT id, %(normal)s, %(paid)s, %(target_date)s
+        FROM changed
+        """,
+        params,
+    )
+    paid_count = cur.rowcount
+
+    # 退会（無料会員または有料会員 → 退会）。変更前のステータスを履歴に残す
+    cur.execute(
+        """
+        WITH target AS (
+            SELECT m.id, m.status
+            FROM member m
+            JOIN member_property mp ON m.id = mp.id
+            WHERE mp.to_quit_days IS NOT NULL
+              AND m.status != %(quit)s
+              AND m.created_at::date + mp.to_quit_days = %(target_date)s
+        ),
+        changed AS (
+            UPDATE member m
+            SET status = %(quit)s, quit_at = %(target_date)s, updated_at = %(target_date)s
+            FROM target t
+            WHERE m.id = t.id
+            RETURNING m.id, t.status AS status_before
+        )
+        INSERT INTO member_status_log (member_id, status_before, status_after, changed_at)
+        SELECT id, status_before, %(quit)s, %(target_date)s
+        FROM changed
+        """,
+        params,
+    )
+    quit_count = cur.rowcount
+
+    if paid_count + quit_count > 0:
+        print(f"  member_status_log: 有料昇格 {paid_count} 件、退会 {quit_count} 件")
+
+
+def process_logins_and_purchases_sql(
+    cur: psycopg2.extensions.cursor,
+    target_date: date,
+    food_count: int,
+) -> None:
+    """process_logins_and_purchases_for_day と同じログイン・購入を SQL で生成する。
+
+    1. アクティブな会員からログイン者を抽選して seed_login に入れ、member_login に追記する
+    2. ログイン者から購入者を抽選し、購入 ID を採番して seed_purchase に入れる
+    3. 再帰 CTE で購入ごとに目標金額に達するまで食品を選び、purchase / purchase_detail に挿入する
+    """
+    cur.execute("TRUNCATE seed_login, seed_purchase")
+
+    cur.execute(
+        """
+        INSERT INTO seed_login (member_id, member_name, address, status, login_at)
+        SELECT
+            id,
+            last_name || first_name,
+            address,
+            status,
+            %(target_date)s::timestamp + floor(random() * 86400) * interval '1 second'
+        FROM (
+            SELECT m.id, m.last_name, m.first_name, m.address, m.status, random() AS r_login
+            FROM member m
+            JOIN member_property mp ON m.id = mp.id
+            WHERE m.status != %(quit)s
+              AND (
+                mp.to_sleep_days IS NULL
+                OR m.created_at::date + mp.to_sleep_days > %(target_date)s
+              )
+        ) a
+        WHERE r_login < CASE WHEN status = %(paid)s THEN 0.50 ELSE 0.20 END
+        """,
+        {"target_date": target_date, "quit": STATUS_QUIT, "paid": STATUS_PAID},
+    )
+    cur.execute("INSERT INTO member_login (member_id, login_at) SELECT member_id, login_at FROM seed_login")
+
+    cur.execute(
+        """
+        INSERT INTO seed_purchase
+            (purchase_id, member_id, member_name, shipping_address, status, purchased_at,
+             target_amount, max_amount)
+        SELECT
+            nextval(pg_get_serial_sequence('purchase', 'id')),
+            member_id,
+            member_name,
+            address,
+            status,
+            %(target_date)s::timestamp + floor(random() * 86400) * interval '1 second',
+            min_amount + floor(random() * (max_amount - min_amount + 1))::integer,
+            max_amount
+        FROM (
+            SELECT
+                l.*,
+                random() AS r_purchase,
+                CASE WHEN l.status = %(paid)s THEN 5000 ELSE 2000 END AS min_amount,
+                CASE WHEN l.status = %(paid)s THEN 20000 ELSE 10000 END AS max_amount
+            FROM seed_login l
+        ) l
+        WHERE r_purchase < CASE WHEN status = %(paid)s THEN 0.50 ELSE 0.30 END
+        """,
+        {"target_date": target_date, "paid": STATUS_PAID},
+    )
+
+    # 1 試行ごとに食品を 1 つ選び、最大金額を超えない場合だけ明細にする（最大 50 試行）
+    # 親子を同じ文で挿入しても、外部キーの検査は文の終わりに行われる
+    cur.execute(
+        """
+        WITH RECURSIVE basket AS (
+            SELECT
+                purchase_id,
+                0 AS attempt,
+                0 AS total,
+                0 AS line_count,
+                NULL::integer AS food_id,
+                NULL::integer AS quantity,
+                target_amount,
+                max_amount
+            FROM seed_purchase
+
+            UNION ALL
+
+            SELECT
+                b.purchase_id,
+                b.attempt + 1,
+                b.total + CASE WHEN b.accepted THEN b.subtotal ELSE 0 END,
+                b.line_count + CASE WHEN b.accepted THEN 1 ELSE 0 END,
+                CASE WHEN b.accepted THEN b.food_id END,
+                CASE WHEN b.accepted THEN b.quantity END,
+                b.target_amount,
+                b.max_amount
+            FROM (
+                SELECT
+                    q.*,
+                    q.price * q.quantity AS subtotal,
+                    q.line_count = 0 OR q.total + q.price * q.quantity <= q.max_amount AS accepted
+                FROM (
+                    SELECT
+                        p.purchase_id,
+                        p.attempt,
+                        p.total,
+                        p.line_count,
+                        p.target_amount,
+                        p.max_amount,
+                        f.id AS food_id,
+                        f.price,
+                        1 + floor(
+                            p.r_quantity * GREATEST(1, LEAST(10, ceil((p.target_amount - p.total)::numeric / f.price)))::integer
+                        )::integer AS quantity
+                    FROM (
+                        SELECT
+                            b.*,
+                            floor(random() * %(food_count)s)::integer AS food_idx,
+                            random() AS r_quantity
+                        FROM basket b
+                        WHERE b.attempt < 50
+                          AND b.total < b.target_amount
+                    ) p
+                    JOIN seed_food f ON f.idx = p.food_idx
+                ) q
+            ) b
+        ),
+        line AS (
+            SELECT b.purchase_id, b.food_id, f.name AS food_name, f.price AS unit_price, b.quantity
+            FROM basket b
+            JOIN seed_food f ON f.id = b.food_id
+        ),
+        header AS (
+            INSERT INTO purchase
+                (id, member_id, member_name, shipping_address, purchased_at, total_amount)
+            SELECT p.purchase_id, p.member_id, p.member_name, p.shipping_address, p.purchased_at, t.total_amount
+            FROM seed_purchase p
+            JOIN (
+                SELECT purchase_id, SUM(unit_price * quantity) AS total_amount
+                FROM line
+                GROUP BY purchase_id
+            ) t ON t.purchase_id = p.purchase_id
+        )
+        INSERT INTO purchase_detail
+            (purchase_id, food_id, food_name, unit_price, quantity, subtotal)
+        SELECT purchase_id, food_id, food_name, unit_price, quantity, unit_price * quantity
+        FROM line
+        """,
+        {"food_count": food_count},
+    )
+
+    cur.execute(
+        """
+        SELECT
+            COUNT(*) FILTER (WHERE status != %(paid)s),
+            COUNT(*) FILTER (WHERE status = %(paid)s)
+        FROM seed_login
+        """,
+        {"paid": STATUS_PAID},
+    )
+    n_logged, p_logged = cur.fetchone()
+    cur.execute(
+        """
+        SELECT
+            COUNT(*) FILTER (WHERE status != %(paid)s),
+            COUNT(*) FILTER (WHERE status = %(paid)s)
+        FROM seed_purchase
+        """,
+        {"paid": STATUS_PAID},
+    )
+    n_bought, p_bought = cur.fetchone()
+    print(
+        f"  login: 通常 {n_logged} 件、有料 {p_logged} 件  "
+        f"purchase: 通常 {n_bought} 件、有料 {p_bought} 件"
+    )
+
+
+def seed_sql(
+    start_date: date,
+    conn_params: dict = CONN_PARAMS,
+    random_seed: int | None = None,
+) -> None:
+    """seed() と同じ仕様のデータを、Postgres 側の INSERT ... SELECT で生成する。
+
+    Python 側で行うのは日ごとの新規会員数の決定と、マスタ・氏名・住所プールの投入だけで、
+    会員・会員属性・ログイン・購入の行は generate_series と random() でサーバー側に生成する。
+    random_seed を指定すると setseed() で SQL 側の乱数も固定する。
+    生成される値そのものは seed() と一致しない（分布・件数の規則は同じ）。
+    """
+    today = date.today()
+    if random_seed is not None:
+        random.seed(random_seed)
+
+    # 年間成長率を 30%〜70% の範囲でランダムに決定（元の 1.3〜1.7 倍）
+    annual_multiplier = random.uniform(1.3, 1.7)
+    daily_rate = annual_multiplier ** (1 / 365) - 1
+
+    print(f"  開始日      : {start_date}")
+    print(f"  終了日      : {today}")
+    print(f"  年間成長率  : {(annual_multiplier - 1) * 100:.1f}%")
+    print(f"  日次成長率  : {daily_rate * 100:.4f}%")
+    print()
+
+    person = Person(locale=Locale.JA, **_provider_kwargs(random_seed))
+    address = Address(locale=Locale.JA, **_provider_kwargs(random_seed))
+
+    conn = psycopg2.connect(**conn_params)
+    try:
+        cur = conn.cursor()
+        if random_seed is not None:
+            # setseed はセッション単位なので、以降の random() はすべてこの接続で実行する
+            cur.execute("SELECT setseed(%s)", (random.uniform(-1, 1),))
+
+        # 全テーブルをTRUNCATE（外部キー依存順：参照元から削除）
+        cur.execute(
+            "TRUNCATE TABLE "
+            "purchase_detail, purchase, member_status_log, member_login, "
+            "member_property, food, member, category"
+        )
+        conn.commit()
+        print("  全テーブルをクリアしました")
+
+        print("カテゴリデータを投入中...")
+        insert_categories(cur, start_date)
+        conn.commit()
+
+        print("食品データを投入中...")
+        category_id_map = get_category_id_map(cur)
+        insert_foods(cur, 1000, start_date, category_id_map, random_seed)
+        conn.commit()
+
+        print("氏名・住所プールを投入中...")
+        create_name_pools(cur, person, address)
+        food_count = create_food_pool(cur)
+        cur.execute(
+            """
+            CREATE TEMP TABLE seed_login (
+                member_id   INTEGER      NOT NULL,
+                member_name VARCHAR(100) NOT NULL,
+                address     VARCHAR(255) NOT NULL,
+                status      VARCHAR(10)  NOT NULL,
+                login_at    TIMESTAMP    NOT NULL
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE seed_purchase (
+                purchase_id      INTEGER      PRIMARY KEY,
+                member_id        INTEGER      NOT NULL,
+                member_name      VARCHAR(100) NOT NULL,
+                shipping_address VARCHAR(255) NOT NULL,
+                status           VARCHAR(10)  NOT NULL,
+                purchased_at     TIMESTAMP    NOT NULL,
+                target_amount    INTEGER      NOT NULL,
+                max_amount       INTEGER      NOT NULL
+            )
+            """
+        )
+        conn.commit()
+        print()
+
+        current_date = start_date
+        total_inserted = 0
+
+        while current_date <= today:
+            days_elapsed = (current_date - start_date).days
+            member_count = get_member_count(cur)
+
+            if days_elapsed < 10:
+                # 開始後 10 日間: 50〜100 人のランダム値
+                new_count = random.randint(50, 100)
+            else:
+                # 11 日目以降: max(0〜3 のランダム値, floor(現在の会員数 × 日次成長率))
+                random_new = random.randint(0, 3)
+                growth_new = int(member_count * daily_rate)
+                new_count = max(random_new, growth_new)
+
+            if new_count > 0:
+                insert_members_sql(cur, new_count, current_date)
+
+            update_member_statuses_sql(cur, current_date)
+            process_logins_and_purchases_sql(cur, current_date, food_count)
+            conn.commit()
+
+            total_inserted += new_count
+            print(f"  {current_date}: 会員 {new_count:4d} 件（累計 {member_count + new_count} 件）")
+            current_date += timedelta(days=1)
+
+        print()
+        updated = refresh_last_login_at(cur)
+        conn.commit()
+        print(f"  member.last_login_at: {updated} 件更新しました")
+        print(f"  合計 {total_inserted} 件挿入しました")
+    finally:
+        conn.close()
+
+
+# シーダーエンジン名 → 生成関数（--engine で選ぶ）
+ENGINES = {
+    "python": seed,
+    "sql": seed_sql,
+}
+
+
 def prompt_start_date() -> date:
     """開始日を対話形式で入力させる（デフォルト: 今日から 5 日前）"""
     default = date.today() - timedelta(days=5)
@@ -600,7 +1173,18 @@ def prompt_start_date() -> date:
         sys.exit(1)
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="デモデータを生成して demo-db に投入する")
+    parser.add_argument(
+        "--engine", choices=sorted(ENGINES), default="python",
+        help="データ生成エンジン（python: Python で行を生成、sql: Postgres 側で生成）",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
+
     print("=== テストデータ生成 ===")
     print()
 
@@ -608,7 +1192,7 @@ def main() -> None:
     print()
 
     try:
-        seed(start_date)
+        ENGINES[args.engine](start_date)
     except psycopg2.OperationalError as e:
         print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
         print("init.py を実行済みか確認してください", file=sys.stderr)
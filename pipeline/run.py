@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""パイプライン実行ツール
+
+demo/init.py → demo/seed.py → seeds_loader/init.py → seeds_loader/load.py → dbt run の各ステージを
+DAG として実行します。ステージごとに入力のフィンガープリントを取り、前回成功時から変わっていない
+ステージ・テーブル・モデルはスキップします。依存関係の無いステージは並列に実行します。
+
+実行前提:
+  - docker-compose.yml の demo-db および dwh-db コンテナが起動していること
+  - プロジェクトルートに .env.local ファイルが存在すること
+
+処理内容:
+  ステージと依存関係:
+    demo_init ──→ demo_seed ──┐
+                              ├──→ loader_load ──→ dbt_run
+    loader_init ──────────────┘
+
+  各ステージの入力（フィンガープリント）:
+    demo_init   : demo/init.py の内容、demo-db のテーブル一覧
+    demo_seed   : demo/seed.py の内容、開始日・乱数シード・今日の日付、demo_init の入力
+    loader_init : seeds_loader/init.py の内容、public_raw スキーマの有無
+    loader_load : テーブルごとに、ソースの件数・最大ID・最大更新日時、転送するカラム、load.py の内容、
+                  loader_init の入力
+    dbt_run     : モデルごとの SQL と同じディレクトリの YAML、マクロと dbt_project.yml、転送したテーブル
+
+  上流のステージが実行された場合、下流のステージは入力が同じでも実行する。
+  loader_load の前に、manifest.json が無い・dbt_project.yml やモデルより古い場合は dbt parse で作り直す。
+  dbt run は変更のあったモデル（<model>+）と転送したテーブル（source:public_raw.<table>+）の下流だけを実行する。
+  demo_seed を実行した場合はデータが作り直されるため、dbt run は --full-refresh で全モデルを実行する。
+  （dbt run が成功するまで state.json にフラグを残し、途中で失敗した場合も次回に引き継ぐ）
+
+  成功したステージの入力は pipeline/state.json に記録する（git 管理外）。
+
+使い方:
+  uv run python pipeline/run.py --start-date 2025-01-01
+  uv run python pipeline/run.py                         # 開始日は前回の値を使う
+  uv run python pipeline/run.py --force dbt_run         # 入力が変わっていなくても実行する
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+import psycopg2
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DBT_PROJECT_DIR = PROJECT_ROOT / "dbt_project"
+DEFAULT_STATE = Path(__file__).parent / "state.json"
+
+# dbt run が成功するまで state.json に残すフラグ（途中で失敗しても次回の dbt run に引き継ぐ）
+PENDING_FULL_REFRESH = "pending_full_refresh"  # demo_seed がデータを作り直した → --full-refresh で全モデル
+PENDING_ALL_MODELS = "pending_all_models"  # loader_init が raw スキーマを作り直した → 全モデル
+
+
+def _load_module(name: str, path: Path) -> ModuleType:
+    """スクリプトをモジュールとして読み込む（init.py 同士の名前衝突を避けるため）"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+DEMO_INIT_PATH = PROJECT_ROOT / "demo" / "init.py"
+DEMO_SEED_PATH = PROJECT_ROOT / "demo" / "seed.py"
+LOADER_INIT_PATH = DBT_PROJECT_DIR / "seeds_loader" / "init.py"
+LOADER_PATH = DBT_PROJECT_DIR / "seeds_loader" / "load.py"
+
+demo_init = _load_module("demo_init", DEMO_INIT_PATH)
+demo_seed = _load_module("demo_seed", DEMO_SEED_PATH)
+loader_init = _load_module("loader_init", LOADER_INIT_PATH)
+loader = _load_module("loader_load", LOADER_PATH)
+
+
+# ---------------------------------------------------------------------------
+# フィンガープリント
+# ---------------------------------------------------------------------------
+
+def file_hash(*paths: Path) -> str:
+    """ファイル（ディレクトリの場合は配下の .sql / .yml）の内容のハッシュ"""
+    digest = hashlib.sha256()
+    for path in paths:
+        files = sorted(
+            p for p in path.rglob("*") if p.suffix in (".sql", ".yml")
+        ) if path.is_dir() else [path]
+        for f in files:
+            digest.update(str(f.relative_to(PROJECT_ROOT)).encode())
+            digest.update(f.read_bytes())
+    return digest.hexdigest()
+
+
+def fingerprint(*parts) -> str:
+    """JSON にできる値の組み合わせのハッシュ"""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def demo_tables() -> list[str] | None:
+    """demo-db のテーブル一覧（データベースが無い場合は None）"""
+    try:
+        conn = psycopg2.connect(**demo_seed.CONN_PARAMS)
+    except psycopg2.OperationalError:
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT table_name FROM information_schema.tables"
+            " WHERE table_schema = 'public' ORDER BY table_name"
+        )
+        return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def raw_schema_exists() -> bool:
+    conn = psycopg2.connect(**loader_init.CONN_PARAMS)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT 1 FROM information_schema.schemata WHERE schema_name = %s",
+            (loader.DEST_SCHEMA,),
+        )
+        return cur.fetchone() is not None
+    finally:
+        conn.close()
+
+
+def source_table_stats() -> dict[str, list]:
+    """ソーステーブルごとの件数・最大ID・最大更新日時"""
+    stats = {}
+    conn = psycopg2.connect(**loader.SRC_CONN_PARAMS)
+    try:
+        cur = conn.cursor()
+        for table_name in loader.TABLES:
+            columns = [row[0] for row in loader.get_column_info(cur, table_name)]
+            exprs = ["COUNT(*)"] + [
+                f"MAX({c})" if c in columns else "NULL" for c in ("id", "updated_at")
+            ]
+            cur.execute(f"SELECT {', '.join(exprs)} FROM {table_name}")
+            stats[table_name] = list(cur.fetchone())
+    finally:
+        conn.close()
+    return stats
+
+
+def loader_column_plan() -> dict[str, list[str] | str]:
+    """テーブルごとに load.py が転送するカラム（manifest.json から決まる）"""
+    references = loader.source_references()
+    plan = {}
+    for table_name in loader.TABLES:
+        if references is None or references.get(table_name, set()) is None:
+            plan[table_name] = "*"
+        elif table_name not in references:
+            plan[table_name] = "skip"
+        else:
+            plan[table_name] = sorted(references[table_name])
+    return plan
+
+
+def model_hashes() -> dict[str, str]:
+    """モデル名 → SQL ファイルと、同じディレクトリの YAML（config・テスト・Lightdash メタデータ）のハッシュ
+
+    YAML はディレクトリ単位でまとめて定義しているため、YAML を変えるとそのディレクトリの全モデルが変更扱いになる。
+    """
+    return {
+        path.stem: file_hash(path, *sorted(path.parent.glob("*.yml")))
+        for path in sorted((DBT_PROJECT_DIR / "models").rglob("*.sql"))
+    }
+
+
+# ---------------------------------------------------------------------------
+# ステージ実行
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Stage:
+    name: str
+    deps: list[str]
+    run: Callable[["Context"], str | None]
+
+
+@dataclass
+class Context:
+    """ステージ間で共有する実行状態"""
+    args: argparse.Namespace
+    state: dict
+    state_path: Path
+    ran: set[str] = field(default_factory=set)
+    results: dict[str, dict] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def previous(self, stage: str) -> dict:
+        return self.state.get(stage, {})
+
+    def must_run(self, stage: Stage, fp: str | None = None) -> bool:
+        """--force 指定・上流の実行・入力の変化のいずれかがあれば実行する"""
+        if stage.name in self.args.force or any(dep in self.ran for dep in stage.deps):
+            return True
+        return fp is not None and self.previous(stage.name).get("fingerprint") != fp
+
+    def commit(
+        self, stage: str, record: dict, set_flags: tuple[str, ...] = (), clear_flags: tuple[str, ...] = ()
+    ) -> None:
+        """ステージの成功を記録する（途中で失敗しても成功したステージの分は残す）
+
+        set_flags / clear_flags は PENDING_* のフラグで、ステージの記録と同時に書き込む。
+        """
+        with self.lock:
+            self.state[stage] = {
+                **record, "finished_at": datetime.now().isoformat(timespec="seconds")
+            }
+            for flag in set_flags:
+                self.state[flag] = True
+            for flag in clear_flags:
+                self.state.pop(flag, None)
+            self.state_path.write_text(
+                json.dumps(self.state, ensure_ascii=False, indent=2, default=str),
+                encoding="utf-8",
+            )
+
+
+def run_demo_init(ctx: Context) -> str | None:
+    stage = STAGES["demo_init"]
+    fp = fingerprint(file_hash(DEMO_INIT_PATH), demo_tables())
+    if not ctx.must_run(stage, fp):
+        return None
+    # main() はエラー時に sys.exit() するため、ワーカースレッドからは呼ばない
+    demo_init.init_demo_database()
+    # テーブルを作り直した後の状態を記録する
+    ctx.commit(stage.name, {"fingerprint": fingerprint(file_hash(DEMO_INIT_PATH), demo_tables())})
+    return "demo-db を作り直しました"
+
+
+def run_demo_seed(ctx: Context) -> str | None:
+    stage = STAGES["demo_seed"]
+    params = {
+        "start_date": ctx.args.start_date or ctx.previous(stage.name).get("params", {}).get("start_date"),
+        "random_seed": ctx.args.random_seed,
+        "today": date.today().isoformat(),
+    }
+    fp = fingerprint(file_hash(DEMO_SEED_PATH), params, ctx.previous("demo_init").get("fingerprint"))
+    if not ctx.must_run(stage, fp):
+        return None
+    if params["start_date"] is None:
+        raise ValueError("demo_seed の開始日が決まりません。--start-date を指定してください")
+    demo_seed.seed(date.fromisoformat(params["start_date"]), random_seed=params["random_seed"])
+    ctx.commit(stage.name, {"fingerprint": fp, "params": params}, set_flags=(PENDING_FULL_REFRESH,))
+    return f"{params['start_date']} から {params['today']} までのデータを生成しました"
+
+
+def run_loader_init(ctx: Context) -> str | None:
+    stage = STAGES["loader_init"]
+    fp = fingerprint(file_hash(LOADER_INIT_PATH), raw_schema_exists())
+    if not ctx.must_run(stage, fp):
+        return None
+    conn = psycopg2.connect(**loader_init.CONN_PARAMS)
+    try:
+        loader_init.init_raw_schema(conn)
+    finally:
+        conn.close()
+    ctx.commit(
+        stage.name,
+        {"fingerprint": fingerprint(file_hash(LOADER_INIT_PATH), True)},
+        set_flags=(PENDING_ALL_MODELS,),
+    )
+    return "public_raw スキーマを作り直しました"
+
+
+def dbt_command(ctx: Context, command: str) -> list[str]:
+    """dbt のコマンドライン（プロジェクト・プロファイル・ターゲットの指定まで）"""
+    args = [
+        command,
+        "--project-dir", str(DBT_PROJECT_DIR),
+        "--profiles-dir", str(DBT_PROJECT_DIR),
+    ]
+    if ctx.args.target:
+        args += ["--target", ctx.args.target]
+    return args
+
+
+def refresh_manifest(ctx: Context) -> None:
+    """manifest.json が無い・古い場合は dbt parse で作り直す（load.py が転送するカラムを決めるため）"""
+    if not loader.manifest_is_stale():
+        return
+    from dbt.cli.main import dbtRunner
+
+    print("[loader_load] manifest.json が無い（または古い）ため、dbt parse を実行します")
+    result = dbtRunner().invoke(dbt_command(ctx, "parse"))
+    if not result.success:
+        raise RuntimeError(f"dbt parse に失敗しました: {result.exception or 'プロジェクトの読み込みに失敗しました'}")
+
+
+def run_loader_load(ctx: Context) -> str | None:
+    stage = STAGES["loader_load"]
+    # 古い manifest.json では全カラムの転送になり、転送するカラムもフィンガープリントに反映されないため先に作り直す
+    refresh_manifest(ctx)
+    loader_hash = file_hash(LOADER_PATH)
+    upstream = ctx.previous("loader_init").get("fingerprint")
+    plan = loader_column_plan()
+    tables = {
+        table_name: fingerprint(stats, loader_hash, upstream, plan[table_name])
+        for table_name, stats in source_table_stats().items()
+    }
+    previous = ctx.previous(stage.name).get("tables", {})
+    force = ctx.must_run(stage)
+    changed = [t for t in loader.TABLES if force or previous.get(t) != tables[t]]
+    if not changed:
+        return None
+    loader.load_tables(changed)
+    ctx.commit(stage.name, {"tables": tables})
+    return f"{len(changed)} テーブルを転送しました: {', '.join(changed)}"
+
+
+def run_dbt(ctx: Context) -> str | None:
+    from dbt.cli.main import dbtRunner
+
+    stage = STAGES["dbt_run"]
+    previous = ctx.previous(stage.name)
+    project = file_hash(DBT_PROJECT_DIR / "dbt_project.yml", DBT_PROJECT_DIR / "macros")
+    models = model_hashes()
+    tables = ctx.previous("loader_load").get("tables", {})
+
+    # demo_seed・loader_init が前回以前に成功し、dbt run が失敗・中断していた場合もフラグが残っている
+    full_refresh = ctx.state.get(PENDING_FULL_REFRESH, False)
+    if (
+        full_refresh
+        or stage.name in ctx.args.force
+        or ctx.state.get(PENDING_ALL_MODELS, False)
+        or previous.get("project") != project
+    ):
+        # データの作り直し・raw スキーマの再作成（staging のビューも削除される）・マクロの変更は全モデルに影響する
+        selectors = []
+    else:
+        prev_models = previous.get("models", {})
+        prev_tables = previous.get("tables", {})
+        selectors = [f"{name}+" for name, h in models.items() if prev_models.get(name) != h]
+        selectors += [
+            f"source:{loader.DEST_SCHEMA}.{t}+" for t, fp in tables.items() if prev_tables.get(t) != fp
+        ]
+        if not selectors:
+            return None
+
+    dbt_args = dbt_command(ctx, "run")
+    if full_refresh:
+        dbt_args.append("--full-refresh")
+    if selectors:
+        dbt_args += ["--select", *selectors]
+
+    result = dbtRunner().invoke(dbt_args)
+    if not result.success:
+        raise RuntimeError(f"dbt run に失敗しました: {result.exception or '失敗したモデルがあります'}")
+    ctx.commit(
+        stage.name,
+        {"project": project, "models": models, "tables": tables},
+        clear_flags=(PENDING_FULL_REFRESH, PENDING_ALL_MODELS),
+    )
+    return "全モデルを実行しました" if not selectors else f"--select {' '.join(selectors)}"
+
+
+STAGES: dict[str, Stage] = {
+    stage.name: stage
+    for stage in [
+        Stage("demo_init", [], run_demo_init),
+        Stage("demo_seed", ["demo_init"], run_demo_seed),
+        Stage("loader_init", [], run_loader_init),
+        Stage("loader_load", ["demo_seed", "loader_init"], run_loader_load),
+        Stage("dbt_run", ["loader_load"], run_dbt),
+    ]
+}
+
+
+def _run_stage(stage: Stage, ctx: Context) -> None:
+    started = time.perf_counter()
+    print(f"[{stage.name}] 開始")
+    try:
+        detail = stage.run(ctx)
+    except SystemExit as e:
+        # SystemExit はスレッドプールの future を素通りして main の except に届かないため、失敗に変換する
+        raise RuntimeError(f"{stage.name} が終了コード {e.code} で終了しました") from None
+    elapsed = time.perf_counter() - started
+    with ctx.lock:
+        if detail is None:
+            ctx.results[stage.name] = {"status": "skipped", "seconds": elapsed, "detail": "入力に変更なし"}
+        else:
+            ctx.ran.add(stage.name)
+            ctx.results[stage.name] = {"status": "ran", "seconds": elapsed, "detail": detail}
+    print(f"[{stage.name}] {'スキップ' if detail is None else '完了'}（{elapsed:.1f} 秒）")
+
+
+def run_pipeline(ctx: Context, workers: int) -> None:
+    """依存ステージが終わったものから順に、スレッドプールで並列に実行する"""
+    pending = dict(STAGES)
+    done: set[str] = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if all(dep in done for dep in stage.deps):
+                    running[executor.submit(_run_stage, stage, ctx)] = name
+                    del pending[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    ctx.results[name] = {"status": "failed", "seconds": 0.0, "detail": str(error)}
+                    # 実行中のステージは最後まで待ち、未着手のステージは実行しない
+                    pending.clear()
+                    wait(running)
+                    raise error
+                done.add(name)
+
+
+# ---------------------------------------------------------------------------
+# メイン処理
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="デモデータ生成から dbt run までのパイプライン")
+    parser.add_argument(
+        "--start-date", help="demo_seed の開始日（YYYY-MM-DD）。省略時は前回の値を使う",
+    )
+    parser.add_argument("--random-seed", type=int, help="demo_seed の乱数シード")
+    parser.add_argument(
+        "--force", nargs="+", choices=list(STAGES), default=[],
+        help="入力が変わっていなくても実行するステージ",
+    )
+    parser.add_argument("--target", help="dbt のターゲット（省略時は profiles.yml のデフォルト）")
+    parser.add_argument("--workers", type=int, default=2, help="並列に実行するステージ数")
+    parser.add_argument("--state", type=Path, default=DEFAULT_STATE, help="状態ファイル")
+    args = parser.parse_args()
+    if args.start_date:
+        try:
+            date.fromisoformat(args.start_date)
+        except ValueError:
+            parser.error(f"--start-date は YYYY-MM-DD 形式で指定してください: {args.start_date}")
+    return args
+
+
+def print_summary(ctx: Context) -> None:
+    print()
+    print(f"{'stage':<12} {'status':<8} {'seconds':>8}  detail")
+    for name in STAGES:
+        result = ctx.results.get(name, {"status": "-", "seconds": 0.0, "detail": ""})
+        print(f"{name:<12} {result['status']:<8} {result['seconds']:>8.1f}  {result['detail']}")
+
+
+def main() -> None:
+    args = parse_args()
+    state = json.loads(args.state.read_text(encoding="utf-8")) if args.state.exists() else {}
+    ctx = Context(args=args, state=state, state_path=args.state)
+
+    print("=== パイプライン実行 ===")
+    print(f"状態ファイル: {args.state}")
+    print()
+
+    failed = False
+    try:
+        run_pipeline(ctx, args.workers)
+    except psycopg2.OperationalError as e:
+        print(f"\n[エラー] データベースに接続できません: {e}", file=sys.stderr)
+        print(
+            "demo-db および dwh-db コンテナが起動しているか確認してください:"
+            " docker compose up -d",
+            file=sys.stderr,
+        )
+        failed = True
+    except (psycopg2.Error, RuntimeError, ValueError) as e:
+        print(f"\n[エラー] {e}", file=sys.stderr)
+        failed = True
+
+    print_summary(ctx)
+    print()
+    if failed:
+        sys.exit(1)
+    print("=== パイプライン完了 ===")
+
+
+if __name__ == "__main__":
+    main()